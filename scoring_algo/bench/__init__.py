@@ -0,0 +1,4 @@
+"""Offline benchmarks and estimates for scoring-algo.
+
+Each module is runnable with `python -m scoring_algo.bench.<name>`.
+"""
@@ -0,0 +1,123 @@
+# importtime.py
+# Usage:
+#   python -m scoring_algo.bench.importtime [--runs 5] [--budget-ms 400] [--out importtime.json]
+# Notes:
+# - Starts a fresh interpreter with `-X importtime` for each CLI entry point below and sums the
+#   self time of every module it imports, minus what a bare `python -c pass` imports (site,
+#   encodings, .pth hooks). The median over --runs is reported; the first, which may compile .pyc
+#   files, is discarded.
+# - `--help`, `report --help` and the imports `report` does before reading any file must not load
+#   the evaluation-only packages (openai, langfuse, tiktoken, httpx, rich.progress).
+# - Exits with status 1 when a scenario is over --budget-ms or loads one of those packages, so it
+#   can guard CI. Import times vary with the machine; the heavy-module check does not.
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ("openai", "langfuse", "tiktoken", "httpx", "rich.progress")
+
+# name -> (code run by the interpreter, whether the heavy modules are forbidden)
+SCENARIOS: Dict[str, Tuple[str, bool]] = {
+    "import_cli": ("import scoring_algo.cli", True),
+    "help": (
+        "import sys; sys.argv = ['scoring-algo', '--help']\n"
+        "from scoring_algo.cli import app; app()",
+        True,
+    ),
+    "report_help": (
+        "import sys; sys.argv = ['scoring-algo', 'report', '--help']\n"
+        "from scoring_algo.cli import app; app()",
+        True,
+    ),
+    "report_imports": ("import scoring_algo.cli, scoring_algo.generate_report", True),
+    "evaluate_imports": ("import scoring_algo.cli, scoring_algo.core.evaluate", False),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_times(code: str) -> Tuple[float, List[str]]:
+    """Total self time in ms of the modules imported by `code`, and their names."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} exited with {proc.returncode}:\n{proc.stderr}")
+    total_us = 0
+    modules: List[str] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        total_us += int(match.group(1))
+        modules.append(match.group(4))
+    return total_us / 1000, modules
+
+
+def _loads(modules: List[str], package: str) -> bool:
+    return any(m == package or m.startswith(package + ".") for m in modules)
+
+
+def measure(code: str, runs: int, baseline_ms: float) -> Tuple[float, List[str]]:
+    _import_times(code)
+    times: List[float] = []
+    modules: List[str] = []
+    for _ in range(runs):
+        ms, modules = _import_times(code)
+        times.append(ms)
+    return max(0.0, statistics.median(times) - baseline_ms), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time of the CLI entry points")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=400.0,
+        help="Largest median import time allowed for the scenarios that forbid heavy modules",
+    )
+    parser.add_argument("--out", type=Path, default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    _import_times("pass")
+    baseline_ms = statistics.median(_import_times("pass")[0] for _ in range(args.runs))
+
+    results: Dict[str, Dict[str, object]] = {}
+    failed: List[str] = []
+    print(f"{'scenario':<18} {'import_ms':>10} {'budget_ms':>10}  heavy modules loaded")
+    for name, (code, light) in SCENARIOS.items():
+        ms, modules = measure(code, args.runs, baseline_ms)
+        heavy = [p for p in HEAVY_MODULES if _loads(modules, p)]
+        over = light and ms > args.budget_ms
+        if over or (light and heavy):
+            failed.append(name)
+        budget = f"{args.budget_ms:.0f}" if light else "-"
+        print(f"{name:<18} {ms:>10.1f} {budget:>10}  {', '.join(heavy) or '-'}")
+        results[name] = {
+            "import_ms": round(ms, 1),
+            "modules": len(modules),
+            "heavy": heavy,
+            "budget_ms": args.budget_ms if light else None,
+            "ok": name not in failed,
+        }
+
+    if args.out is not None:
+        result = {"baseline_ms": round(baseline_ms, 1), "scenarios": results}
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    if failed:
+        print(f"Over budget or loading heavy modules: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# loader_memory.py
+# Usage:
+#   python -m scoring_algo.bench.loader_memory --size-mb 500 [--workdir /tmp/loader-bench] [--keep]
+# Notes:
+# - Writes a synthetic baseline-shaped scan file ({ project, findings: [...] }) of about --size-mb
+#   megabytes, with multi-kilobyte descriptions, then measures the peak Python heap (tracemalloc)
+#   and wall time of three ways of reading it:
+#     whole-file    json.loads(path.read_text()) followed by building every Vulnerability (the
+#                   loader before streaming)
+#     stream        iterating iter_scan_results without keeping the findings
+#     stream+list   read_scan_results, i.e. the streamed findings kept in a list
+# - Each measurement runs in a fresh interpreter so one does not inflate the next one's peak.
+#   tracemalloc slows parsing down several times; compare the timings with each other only.
+
+import argparse
+import json
+import multiprocessing
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from scoring_algo.core.storage import (
+    _map_category_from_vulnerability_type,
+    _to_vulnerability,
+    get_scan_path,
+    iter_scan_results,
+    read_scan_results,
+)
+
+REPO = "synthetic"
+SCAN_SOURCE = "baseline"
+_WORDS = (
+    "reentrancy oracle price manipulation vault share inflation rounding withdraw deposit "
+    "collateral liquidation borrow repay allowance transferFrom permit signature replay "
+    "overflow underflow slippage deadline timestamp governance timelock upgrade proxy"
+).split()
+
+
+def write_synthetic_scan(data_root: Path, size_mb: int, seed: int = 0) -> Tuple[Path, int]:
+    """Write a scan file of roughly `size_mb` MB and return its path and finding count."""
+    rng = random.Random(seed)
+    path = get_scan_path(REPO, data_root, SCAN_SOURCE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    target = size_mb * 1024 * 1024
+    written = 0
+    count = 0
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write('{"project": "synthetic", "findings": [\n')
+        while written < target:
+            finding = {
+                "title": " ".join(rng.choices(_WORDS, k=8)),
+                "description": " ".join(rng.choices(_WORDS, k=rng.randint(300, 900))),
+                "vulnerability_type": rng.choice(["reentrancy", "logic error", "access control"]),
+                "severity": rng.choice(["high", "medium", "low", "info"]),
+                "confidence": rng.random(),
+                "location": f"L{rng.randint(1, 2000)}",
+                "file": f"src/Contract{rng.randint(1, 40)}.sol",
+                "id": count,
+            }
+            line = ("" if count == 0 else ",\n") + json.dumps(finding)
+            fh.write(line)
+            written += len(line)
+            count += 1
+        fh.write("\n]}\n")
+    return path, count
+
+
+def _whole_file(data_root: Path) -> int:
+    path = get_scan_path(REPO, data_root, SCAN_SOURCE)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    findings = [
+        _to_vulnerability(
+            {
+                "Issue": f.get("title"),
+                "Severity": f.get("severity"),
+                "Description": f.get("description"),
+                "file": f.get("file"),
+                "Category": _map_category_from_vulnerability_type(f.get("vulnerability_type")),
+            }
+        )
+        for f in data["findings"]
+    ]
+    return len(findings)
+
+
+def _stream(data_root: Path) -> int:
+    return sum(1 for _ in iter_scan_results(REPO, data_root, SCAN_SOURCE))
+
+
+def _stream_list(data_root: Path) -> int:
+    return len(read_scan_results(REPO, data_root, SCAN_SOURCE))
+
+
+LOADERS: Dict[str, Callable[[Path], int]] = {
+    "whole-file": _whole_file,
+    "stream": _stream,
+    "stream+list": _stream_list,
+}
+
+
+def _measure(name: str, data_root: Path, queue: "multiprocessing.Queue") -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = LOADERS[name](data_root)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put((count, peak, elapsed))
+
+
+def measure(name: str, data_root: Path) -> Tuple[int, int, float]:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(name, data_root, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak memory of the scan-file loaders")
+    parser.add_argument("--size-mb", type=int, default=500, help="Synthetic scan file size")
+    parser.add_argument("--workdir", type=Path, default=None, help="Where to write the file")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic file")
+    args = parser.parse_args()
+
+    data_root = args.workdir or Path(tempfile.mkdtemp(prefix="loader-bench-"))
+    try:
+        path, count = write_synthetic_scan(data_root, args.size_mb)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"Synthetic scan file: {path} ({size_mb:.0f} MB, {count} findings)")
+        print(f"{'loader':<12} {'findings':>9} {'peak MB':>9} {'seconds':>9}")
+        for name in LOADERS:
+            loaded, peak, elapsed = measure(name, data_root)
+            print(f"{name:<12} {loaded:>9} {peak / (1024 * 1024):>9.1f} {elapsed:>9.1f}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(data_root / SCAN_SOURCE, ignore_errors=True)
+            if args.workdir is None:
+                shutil.rmtree(data_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+# mock_server.py
+# Usage:
+#   python -m scoring_algo.bench.mock_server --port 8089 --latency lognormal --latency-ms 800 \
+#       --error-rate 0.01 --rate-limit-rate 0.02 --match-prob 0.1 --partial-prob 0.05
+#   OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock python -m scoring_algo.cli evaluate
+# Notes:
+# - Offline stand-in for the OpenAI Responses API (POST /v1/responses), enough for
+#   client.responses.parse: it answers every request with a verdict in the JSON schema the request
+#   asked for (a Finding, or one verdict per truth_id for JUDGE_MODE=multi), and a usage block with
+#   input tokens estimated at ~4 characters per token.
+# - Each request sleeps for a latency drawn from --latency:
+#     fixed         --latency-ms
+#     uniform       --latency-ms +/- --latency-spread * --latency-ms
+#     lognormal     median --latency-ms, sigma --latency-spread
+#     exponential   mean --latency-ms
+# - --error-rate answers with a 500 and --rate-limit-rate with a 429 (and a retry-after header), so
+#   the request scheduler's retries are exercised. --match-prob / --partial-prob set how often a
+#   verdict is a match or a partial match of a random finding of the batch.
+# - Batch API (evaluate --mode batch): POST /v1/files takes the JSONL upload, POST /v1/batches
+#   starts a job that completes --batch-delay-ms later, GET /v1/batches/<id> polls it and
+#   GET /v1/files/<id>/content returns the output and error files. Each line of a job gets the same
+#   verdicts and error rates as an interactive request, without the per-request latency.
+# - GET /stats returns the request counters; the first stdout line is "listening on <base url>", so
+#   --port 0 can be used to pick a free port.
+
+import argparse
+import email.parser
+import email.policy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+_INDEX_RE = re.compile(r'"Index": (\d+)')
+_TRUTH_ID_RE = re.compile(r'"truth_id": (\d+)')
+
+
+@dataclass
+class MockConfig:
+    latency: str = "fixed"
+    latency_ms: float = 200.0
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    match_prob: float = 0.1
+    partial_prob: float = 0.05
+    batch_delay_ms: float = 500.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    latency_s: float = 0.0
+    batches: int = 0
+    batch_requests: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")
+            }
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, config: MockConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.stats = MockStats()
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._store_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def draw_latency(self) -> float:
+        cfg = self.config
+        mean = cfg.latency_ms / 1000
+        with self._rng_lock:
+            if cfg.latency == "uniform":
+                spread = mean * cfg.latency_spread
+                return max(0.0, self._rng.uniform(mean - spread, mean + spread))
+            if cfg.latency == "lognormal":
+                return self._rng.lognormvariate(0.0, cfg.latency_spread) * mean
+            if cfg.latency == "exponential":
+                return self._rng.expovariate(1 / mean) if mean > 0 else 0.0
+            return mean
+
+    def draw_outcome(self) -> str:
+        """The outcome of the next request: "error", "rate_limited" or "ok"."""
+        with self._rng_lock:
+            r = self._rng.random()
+        if r < self.config.error_rate:
+            return "error"
+        if r < self.config.error_rate + self.config.rate_limit_rate:
+            return "rate_limited"
+        return "ok"
+
+    def verdict(self, prompt: str) -> Dict[str, Any]:
+        indices = [int(i) for i in _INDEX_RE.findall(prompt)]
+        with self._rng_lock:
+            r = self._rng.random()
+            index = self._rng.choice(indices) if indices else -1
+        is_match = r < self.config.match_prob
+        is_partial = not is_match and r < self.config.match_prob + self.config.partial_prob
+        if not (is_match or is_partial):
+            index = -1
+        return {
+            "is_match": is_match,
+            "is_partial_match": is_partial,
+            "explanation": "mock verdict",
+            "severity_from_junior_auditor": "N/A",
+            "severity_from_truth": "N/A",
+            "index_of_finding_from_junior_auditor": index,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so the client's connection pool behaves as it does against the real API
+    protocol_version = "HTTP/1.1"
+    server: MockLLMServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _send_json(
+        self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_bytes(self, data: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        path = self.path.rstrip("/").removeprefix("/v1")
+        parts = path.split("/")
+        server = self.server
+        if path == "/stats":
+            self._send_json(200, server.stats.to_dict())
+        elif len(parts) == 4 and parts[1] == "files" and parts[3] == "content":
+            data = server.files.get(parts[2])
+            if data is None:
+                self._send_json(404, _error("No such file", "not_found"))
+            else:
+                self._send_bytes(data)
+        elif len(parts) == 3 and parts[1] == "batches" and parts[2] in server.batches:
+            with server._store_lock:
+                self._send_json(200, dict(server.batches[parts[2]]))
+        else:
+            self._send_json(404, _error("Not found", "not_found"))
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        path = self.path.rstrip("/").removeprefix("/v1")
+        if path == "/files":
+            content_type = self.headers.get("Content-Type", "")
+            self._send_json(200, _upload_file(self.server, content_type, raw))
+            return
+        if path == "/batches":
+            self._send_json(200, _create_batch(self.server, json.loads(raw)))
+            return
+        if path != "/responses":
+            self._send_json(404, _error("Not found", "not_found"))
+            return
+        try:
+            request = json.loads(raw)
+        except json.JSONDecodeError:
+            self._send_json(400, _error("Invalid JSON body", "invalid_request_error"))
+            return
+
+        server = self.server
+        latency = server.draw_latency()
+        outcome = server.draw_outcome()
+        time.sleep(latency)
+        with server.stats._lock:
+            server.stats.requests += 1
+            server.stats.latency_s += latency
+            if outcome == "error":
+                server.stats.errors += 1
+            elif outcome == "rate_limited":
+                server.stats.rate_limited += 1
+            else:
+                server.stats.ok += 1
+
+        if outcome == "error":
+            self._send_json(500, _error("Mock server error", "server_error"))
+            return
+        if outcome == "rate_limited":
+            self._send_json(
+                429,
+                _error("Mock rate limit", "rate_limit_exceeded"),
+                headers={"retry-after": "0.1"},
+            )
+            return
+        self._send_json(200, _response(request, server))
+
+
+def _upload_file(server: MockLLMServer, content_type: str, raw: bytes) -> Dict[str, Any]:
+    message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + raw
+    )
+    data, filename, purpose = b"", "upload.jsonl", "batch"
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name == "file":
+            data = part.get_payload(decode=True) or b""
+            filename = part.get_filename() or filename
+        elif name == "purpose":
+            purpose = part.get_content().strip()
+    file_id = f"file-{uuid.uuid4().hex}"
+    server.files[file_id] = data
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(data),
+        "created_at": int(time.time()),
+        "filename": filename,
+        "purpose": purpose,
+        "status": "processed",
+    }
+
+
+def _create_batch(server: MockLLMServer, request: Dict[str, Any]) -> Dict[str, Any]:
+    batch_id = f"batch_{uuid.uuid4().hex}"
+    now = int(time.time())
+    batch = {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": request.get("endpoint"),
+        "errors": None,
+        "input_file_id": request.get("input_file_id"),
+        "completion_window": request.get("completion_window", "24h"),
+        "status": "in_progress",
+        "output_file_id": None,
+        "error_file_id": None,
+        "created_at": now,
+        "in_progress_at": now,
+        "expires_at": now + 24 * 3600,
+        "completed_at": None,
+        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        "metadata": request.get("metadata"),
+    }
+    with server._store_lock:
+        server.batches[batch_id] = batch
+    timer = threading.Timer(server.config.batch_delay_ms / 1000, _run_batch, (server, batch_id))
+    timer.daemon = True
+    timer.start()
+    return dict(batch)
+
+
+def _run_batch(server: MockLLMServer, batch_id: str) -> None:
+    batch = server.batches[batch_id]
+    lines = server.files.get(batch["input_file_id"], b"").decode("utf-8").splitlines()
+    output: List[str] = []
+    errors: List[str] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        outcome = server.draw_outcome()
+        record: Dict[str, Any] = {
+            "id": f"batch_req_{uuid.uuid4().hex}",
+            "custom_id": item["custom_id"],
+        }
+        if outcome == "ok":
+            record["response"] = {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": _response(item["body"], server),
+            }
+            record["error"] = None
+            output.append(json.dumps(record))
+        else:
+            if outcome == "error":
+                status, code = 500, "server_error"
+            else:
+                status, code = 429, "rate_limit_exceeded"
+            record["response"] = {
+                "status_code": status,
+                "request_id": uuid.uuid4().hex,
+                "body": _error(f"Mock {code}", code),
+            }
+            record["error"] = None
+            errors.append(json.dumps(record))
+
+    with server._store_lock:
+        for name, content in (("output_file_id", output), ("error_file_id", errors)):
+            if content:
+                file_id = f"file-{uuid.uuid4().hex}"
+                server.files[file_id] = ("\n".join(content) + "\n").encode("utf-8")
+                batch[name] = file_id
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+        batch["request_counts"] = {
+            "total": len(output) + len(errors),
+            "completed": len(output),
+            "failed": len(errors),
+        }
+    with server.stats._lock:
+        server.stats.batches += 1
+        server.stats.batch_requests += len(output) + len(errors)
+
+
+def _error(message: str, code: str) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": code, "param": None, "code": code}}
+
+
+def _prompt_of(request: Dict[str, Any]) -> str:
+    items = request.get("input")
+    if isinstance(items, str):
+        return items
+    parts: List[str] = []
+    for item in items or []:
+        content = item.get("content", "")
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+
+def _response(request: Dict[str, Any], server: MockLLMServer) -> Dict[str, Any]:
+    prompt = _prompt_of(request)
+    schema = ((request.get("text") or {}).get("format") or {}).get("schema") or {}
+    if "verdicts" in (schema.get("properties") or {}):
+        ids = [int(i) for i in _TRUTH_ID_RE.findall(prompt)]
+        payload: Dict[str, Any] = {
+            "verdicts": [dict(server.verdict(prompt), truth_id=i) for i in ids]
+        }
+    else:
+        payload = server.verdict(prompt)
+    text = json.dumps(payload)
+    input_tokens = len(prompt) // 4
+    output_tokens = len(text) // 4
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": request.get("model", "mock"),
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median / mean latency")
+    parser.add_argument(
+        "--latency-spread",
+        type=float,
+        default=0.5,
+        help="Half-width fraction for uniform, sigma for lognormal",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests answered with 500"
+    )
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429"
+    )
+    parser.add_argument("--match-prob", type=float, default=0.1)
+    parser.add_argument("--partial-prob", type=float, default=0.05)
+    parser.add_argument(
+        "--batch-delay-ms", type=float, default=500.0, help="Time a Batch API job takes to complete"
+    )
+    parser.add_argument(
+        "--mock-seed", type=int, default=None, help="Seed for latencies and verdicts"
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        match_prob=args.match_prob,
+        partial_prob=args.partial_prob,
+        batch_delay_ms=args.batch_delay_ms,
+        seed=args.mock_seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 picks a free port")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLLMServer((args.host, args.port), config_from_args(args))
+    print(f"listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# prompt_build.py
+# Usage:
+#   python -m scoring_algo.bench.prompt_build --findings 500 2000 10000 --truths 20 --batch-size 10
+# Notes:
+# - Times building every (truth, batch) prompt of a synthetic repo, without calling any API, in
+#   two ways:
+#     per-prompt    what process_in_batches did before: prompt-item dicts and json.dumps(indent=2)
+#                   for every batch of every truth finding, then a str.replace pass per placeholder
+#     cached        the current path: each record's JSON is serialized once, each Batch keeps its
+#                   assembled JSON, the truth JSON is rendered once per truth finding, and the
+#                   template is split once so a prompt is a single join
+# - Both paths are checked to produce identical prompts. Every batch is counted (no early exit).
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+from scoring_algo.core.batching import batch_json, build_batches, build_prompt
+from scoring_algo.core.prompt import PROMPT_LAYOUTS
+from scoring_algo.core.types import Vulnerability, WorkingResult
+
+_WORDS = (
+    "reentrancy oracle price manipulation vault share inflation rounding withdraw deposit "
+    "collateral liquidation borrow repay allowance transferFrom permit signature replay"
+).split()
+
+
+def _synthetic(n: int, rng: random.Random) -> List[Vulnerability]:
+    return [
+        Vulnerability(
+            Issue=" ".join(rng.choices(_WORDS, k=8)),
+            Severity=rng.choice(["High", "Medium", "Low"]),
+            Contracts=[f"src/Contract{rng.randint(1, 40)}.sol"],
+            Description=" ".join(rng.choices(_WORDS, k=rng.randint(60, 200))),
+        )
+        for _ in range(n)
+    ]
+
+
+def _per_prompt(truths: List[Vulnerability], batches: List[List[WorkingResult]]) -> List[str]:
+    prompts = []
+    for truth in truths:
+        for batch in batches:
+            items = [b.prompt_item(i) for i, b in enumerate(batch)]
+            prompts.append(
+                PROMPT_LAYOUTS["default"]
+                .replace("{truth_finding}", truth.model_dump_json(indent=2))
+                .replace("{junior_findings}", json.dumps(items, indent=2))
+                .strip()
+            )
+    return prompts
+
+
+def _cached(truths: List[Vulnerability], batches: List[List[WorkingResult]]) -> List[str]:
+    prompts = []
+    for truth in truths:
+        truth_json = truth.model_dump_json(indent=2)
+        for batch in batches:
+            prompts.append(build_prompt(truth_json, batch_json(batch), "default"))
+    return prompts
+
+
+def _time(fn: Callable[[], List[str]]) -> tuple[float, List[str]]:
+    started = time.perf_counter()
+    prompts = fn()
+    return time.perf_counter() - started, prompts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt-build time for large working sets")
+    parser.add_argument("--findings", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--truths", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    truths = _synthetic(args.truths, rng)
+    print(f"{'findings':>9} {'prompts':>9} {'per-prompt s':>13} {'cached s':>9} {'speedup':>8}")
+    for n in args.findings:
+        findings = _synthetic(n, rng)
+        # Fresh records and batches per path, so the cached path pays its one-off serialization
+        old_batches = build_batches(
+            [WorkingResult.from_vulnerability(v, i) for i, v in enumerate(findings)],
+            args.batch_size,
+        )
+        new_batches = build_batches(
+            [WorkingResult.from_vulnerability(v, i) for i, v in enumerate(findings)],
+            args.batch_size,
+        )
+        old_s, old_prompts = _time(lambda: _per_prompt(truths, old_batches))
+        new_s, new_prompts = _time(lambda: _cached(truths, new_batches))
+        if old_prompts != new_prompts:
+            raise SystemExit("Prompt mismatch between the two paths")
+        print(f"{n:>9} {len(new_prompts):>9} {old_s:>13.2f} {new_s:>9.2f} {old_s / new_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
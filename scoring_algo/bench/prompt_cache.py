@@ -0,0 +1,129 @@
+# prompt_cache.py
+# Usage:
+#   python -m scoring_algo.bench.prompt_cache --data-root ./data --scan-source baseline \
+#       --out PROMPT_CACHE.md
+# Notes:
+# - Estimates, without calling any API, the prompt tokens billed for every (truth, batch) prompt
+#   of the bundled repos under each prompt layout, assuming OpenAI-style prefix caching: a prompt
+#   reuses the longest prefix it shares with an earlier prompt once that prefix reaches 1024
+#   tokens, in 128-token increments, and cached tokens are billed at --cached-rate of the normal
+#   price.
+# - Prompts are visited in the order run_evaluation dispatches them with MAX_CONCURRENCY=1 (truth
+#   by truth, batch by batch), every batch is counted (no early exit on a match), and one call per
+#   prompt is assumed; extra votes scale both layouts alike.
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from scoring_algo.core.batching import batch_json, build_batches, build_prompt
+from scoring_algo.core.llm import count_tokens
+from scoring_algo.core.prompt import PROMPT_LAYOUTS
+from scoring_algo.core.storage import get_scan_path, read_scan_results, read_truth_data
+from scoring_algo.core.types import WorkingResult
+
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT = 128
+
+
+def _cacheable(shared_tokens: int) -> int:
+    if shared_tokens < CACHE_MIN_TOKENS:
+        return 0
+    return shared_tokens - (shared_tokens - CACHE_MIN_TOKENS) % CACHE_INCREMENT
+
+
+def estimate_layout(
+    truth: list, batches: List[List[WorkingResult]], layout: str
+) -> Tuple[int, int]:
+    """Return (prompt tokens, cached prompt tokens) for every (truth, batch) prompt."""
+    template = PROMPT_LAYOUTS[layout]
+    truth_first = template.index("{truth_finding}") < template.index("{junior_findings}")
+    placeholder = "{truth_finding}" if truth_first else "{junior_findings}"
+    start = template.index(placeholder)
+    end = start + len(placeholder)
+    before, after = template[:start], template[end : template.index("```", end) + 3]  # noqa: E203
+    static_prefix = count_tokens(before)
+
+    batch_texts = [batch_json(batch) for batch in batches]
+    total = 0
+    cached = 0
+    # Tokens shared by all prompts with the same first variable segment (truth or batch)
+    segment_prefix: Dict[int, int] = {}
+    for t_idx, t in enumerate(truth):
+        truth_json = t.model_dump_json(indent=2)
+        for b_idx, junior_json in enumerate(batch_texts):
+            tokens = count_tokens(build_prompt(truth_json, junior_json, layout))
+            key = t_idx if truth_first else b_idx
+            if key in segment_prefix:
+                shared = segment_prefix[key]
+            elif total:
+                shared = static_prefix
+            else:
+                shared = 0
+            if key not in segment_prefix:
+                value = truth_json if truth_first else junior_json
+                segment_prefix[key] = count_tokens(before + value + after)
+            total += tokens
+            cached += min(tokens, _cacheable(shared))
+    return total, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare billed prompt tokens of each prompt layout on the bundled repos."
+    )
+    parser.add_argument("--data-root", type=Path, default=Path("data"))
+    parser.add_argument("--scan-source", default="baseline")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument(
+        "--cached-rate",
+        type=float,
+        default=0.25,
+        help="Price of a cached prompt token relative to an uncached one",
+    )
+    parser.add_argument("--out", type=Path, default=None, help="Optional Markdown output file")
+    args = parser.parse_args()
+
+    repos = sorted(p.stem for p in (args.data_root / "source_of_truth").glob("*.json"))
+    lines: List[str] = [
+        "| Repo | Prompts | Layout | Prompt tokens | Cached | Billed (equiv.) | vs default |",
+        "|------|---------|--------|---------------|--------|-----------------|------------|",
+    ]
+    totals: Dict[str, List[float]] = {layout: [0, 0, 0.0] for layout in PROMPT_LAYOUTS}
+    for repo in repos:
+        if not get_scan_path(repo, args.data_root, args.scan_source).exists():
+            continue
+        truth = read_truth_data(repo, args.data_root)
+        results = read_scan_results(repo, args.data_root, args.scan_source)
+        working = [WorkingResult.from_vulnerability(r, i) for i, r in enumerate(results)]
+        batches = build_batches(working, args.batch_size)
+        baseline_billed = None
+        for layout in PROMPT_LAYOUTS:
+            total, cached = estimate_layout(truth, batches, layout)
+            billed = (total - cached) + cached * args.cached_rate
+            if baseline_billed is None:
+                baseline_billed = billed
+            totals[layout][0] += total
+            totals[layout][1] += cached
+            totals[layout][2] += billed
+            delta = (billed / baseline_billed - 1) * 100 if baseline_billed else 0.0
+            lines.append(
+                f"| {repo} | {len(truth) * len(batches)} | {layout} | {total} | {cached} | "
+                f"{billed:.0f} | {delta:+.1f}% |"
+            )
+    default_billed = totals["default"][2]
+    for layout, (total, cached, billed) in totals.items():
+        delta = (billed / default_billed - 1) * 100 if default_billed else 0.0
+        lines.append(
+            f"| ALL | - | {layout} | {total:.0f} | {cached:.0f} | {billed:.0f} | {delta:+.1f}% |"
+        )
+
+    md = "\n".join(lines)
+    print(md)
+    if args.out:
+        args.out.write_text(md + "\n", encoding="utf-8")
+        print(f"Wrote estimate to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# telemetry_overhead.py
+# Usage:
+#   python -m scoring_algo.bench.telemetry_overhead --data-root ./data \
+#       [--repo code4rena_loopfi_2025_02] [--calls 500] [--rounds 3] [--out telemetry_overhead.json]
+# Notes:
+# - Sends the (truth, batch) prompts of one bundled repo through LLMClient.generate_async, one call
+#   at a time, against a backend that answers at once with a fixed verdict, so the client's own
+#   work is what gets measured. Runs alternate between telemetry off and on, --rounds times each,
+#   and the median of each figure is reported.
+# - With telemetry on, Langfuse exports to a local sink that accepts and discards every request,
+#   so the whole path (span creation, payload rendering, attribute serialization, OTLP export)
+#   runs.
+# - Reports per call: CPU time of the event-loop thread (what delays other requests), CPU time of
+#   the whole process including the exporter threads (measured after flushing them), and wall
+#   time. For reference, tokenize_us is the cost of counting the prompt's tokens locally, which
+#   the usage block now replaces.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Type, TypeVar
+
+from pydantic import BaseModel
+
+from scoring_algo.core.backends import BackendResponse
+from scoring_algo.core.batching import batch_json, build_batches, build_prompt
+from scoring_algo.core.llm import LLMClient, count_tokens
+from scoring_algo.core.storage import read_scan_results, read_truth_data
+from scoring_algo.core.telemetry import get_generation_exporter, set_telemetry
+from scoring_algo.core.types import WorkingResult
+
+M = TypeVar("M", bound=BaseModel)
+
+_VERDICT = {
+    "is_match": False,
+    "is_partial_match": False,
+    "explanation": "No finding of the junior auditor describes this issue.",
+    "severity_from_junior_auditor": "N/A",
+    "severity_from_truth": "High",
+    "index_of_finding_from_junior_auditor": -1,
+}
+
+
+class _InstantBackend:
+    async def parse(self, model: str, prompt: str, text_format: Type[M]) -> BackendResponse:
+        parsed = text_format.model_validate(_VERDICT)
+        return BackendResponse(parsed=parsed, input_tokens=len(prompt) // 4, output_tokens=60)
+
+
+class _Sink(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = _reply
+
+
+def _prompts(data_root: Path, repo: str, scan_source: str, batch_size: int, n: int) -> List[str]:
+    truth = read_truth_data(repo, data_root)
+    results = read_scan_results(repo, data_root, scan_source)
+    working = [WorkingResult.from_vulnerability(r, i) for i, r in enumerate(results)]
+    batch_texts = [batch_json(b) for b in build_batches(working, batch_size)]
+    prompts = [
+        build_prompt(t.model_dump_json(indent=2), junior_json)
+        for t in truth
+        for junior_json in batch_texts
+    ]
+    return (prompts * (n // max(1, len(prompts)) + 1))[:n]
+
+
+def _flush() -> None:
+    get_generation_exporter().flush()
+    try:
+        from langfuse import get_client
+
+        get_client().flush()
+    except Exception:
+        pass
+
+
+def measure(prompts: List[str], telemetry: bool) -> Dict[str, float]:
+    set_telemetry(telemetry)
+    client = LLMClient(model="local", backend=_InstantBackend())
+
+    async def run() -> float:
+        loop_started = time.thread_time()
+        for vote, prompt in enumerate(prompts):
+            await client.generate_async(prompt, vote=vote)
+        return time.thread_time() - loop_started
+
+    process_started = time.process_time()
+    wall_started = time.perf_counter()
+    loop_cpu = asyncio.run(run())
+    wall = time.perf_counter() - wall_started
+    _flush()
+    process_cpu = time.process_time() - process_started
+    n = len(prompts)
+    return {
+        "loop_cpu_us": round(loop_cpu / n * 1e6, 1),
+        "process_cpu_us": round(process_cpu / n * 1e6, 1),
+        "wall_us": round(wall / n * 1e6, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CPU time per LLM call with telemetry on vs off")
+    parser.add_argument("--data-root", type=Path, default=Path("data"))
+    parser.add_argument("--scan-source", default="baseline")
+    parser.add_argument("--repo", default="code4rena_loopfi_2025_02")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--out", type=Path, default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    sink = ThreadingHTTPServer(("127.0.0.1", 0), _Sink)
+    sink.daemon_threads = True
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    # Read when the Langfuse client is first created, i.e. by the first traced call
+    os.environ["LANGFUSE_HOST"] = f"http://127.0.0.1:{sink.server_address[1]}"
+    os.environ["LANGFUSE_PUBLIC_KEY"] = "pk-lf-bench"
+    os.environ["LANGFUSE_SECRET_KEY"] = "sk-lf-bench"
+
+    prompts = _prompts(args.data_root, args.repo, args.scan_source, args.batch_size, args.calls)
+    # Warm up imports, the encoding and the Langfuse client outside the measured runs
+    measure(prompts[:20], telemetry=True)
+    runs: Dict[bool, List[Dict[str, float]]] = {False: [], True: []}
+    for _ in range(args.rounds):
+        for telemetry in (False, True):
+            runs[telemetry].append(measure(prompts, telemetry))
+    sink.shutdown()
+    off, on = (
+        {key: statistics.median(r[key] for r in runs[t]) for key in runs[t][0]}
+        for t in (False, True)
+    )
+
+    tokenize_started = time.process_time()
+    for prompt in prompts:
+        count_tokens(prompt, "local")
+    tokenize_us = (time.process_time() - tokenize_started) / len(prompts) * 1e6
+
+    print(f"{'per call':<16} {'off':>10} {'on':>10} {'overhead':>10}")
+    for key in ("loop_cpu_us", "process_cpu_us", "wall_us"):
+        print(f"{key:<16} {off[key]:>10.1f} {on[key]:>10.1f} {on[key] - off[key]:>+10.1f}")
+    print(f"{'tokenize_us':<16} {tokenize_us:>10.1f}")
+    exporter = get_generation_exporter()
+    print(f"exporter {exporter.stats.summary()}")
+    if args.out is not None:
+        result = {
+            "repo": args.repo,
+            "calls": len(prompts),
+            "off": off,
+            "on": on,
+            "tokenize_us": round(tokenize_us, 1),
+            "exporter": vars(exporter.stats),
+        }
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
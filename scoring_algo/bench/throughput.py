@@ -0,0 +1,236 @@
+# throughput.py
+# Usage:
+#   python -m scoring_algo.bench.throughput --data-root ./data --out throughput.json \
+#       [--repos code4rena_loopfi_2025_02 ...] \
+#       [--latency lognormal --latency-ms 300 --error-rate 0.01]
+#   python -m scoring_algo.bench.throughput --data-root ./data --out new.json --compare old.json
+# Notes:
+# - Runs the real run_evaluation path on the bundled repos against mock_server, started as a
+#   subprocess on a free port and reached through OPENAI_BASE_URL, so nothing is billed. Results
+#   go to a temporary output root; the verdict cache is off and telemetry is disabled unless
+#   --telemetry is given.
+# - Repos run one after another. Records calls per second over the whole run, p50/p95/p99 of the
+#   per-call latency (each HTTP request, retries included as separate calls) and of the per-repo
+#   wall time, the mock server's counters, and the peak RSS of this process (the server excluded).
+# - "metrics" holds the per-stage timers and gauges of core.metrics for the whole run.
+# - The JSON carries the git commit it ran on; --compare prints the change against an earlier
+#   file. Keep the mock options the same across the two runs, and --mock-seed fixed, for a fair
+#   comparison.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from scoring_algo.bench.mock_server import add_mock_arguments, config_from_args
+from scoring_algo.core.evaluate import run_evaluation
+from scoring_algo.core.llm import collect_call_durations
+from scoring_algo.core.metrics import get_metrics
+from scoring_algo.core.storage import get_scan_path
+from scoring_algo.core.telemetry import set_telemetry
+from scoring_algo.settings import get_settings
+
+# Metrics compared by --compare, and whether higher is better
+COMPARED = {
+    "calls_per_s": True,
+    "call_latency_ms.p50": False,
+    "call_latency_ms.p95": False,
+    "call_latency_ms.p99": False,
+    "repo_latency_s.p50": False,
+    "repo_latency_s.p95": False,
+    "repo_latency_s.p99": False,
+    "wall_s": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentiles(values: List[float], scale: float = 1.0) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    arr = np.asarray(values, dtype=np.float64) * scale
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(arr.mean()), 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _default_repos(data_root: Path, scan_source: str) -> List[str]:
+    return sorted(
+        p.stem
+        for p in (data_root / "source_of_truth").glob("*.json")
+        if get_scan_path(p.stem, data_root, scan_source).exists()
+    )
+
+
+def _mock_argv(args: argparse.Namespace) -> List[str]:
+    argv = [
+        "--port", "0",
+        "--latency", args.latency,
+        "--latency-ms", str(args.latency_ms),
+        "--latency-spread", str(args.latency_spread),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--match-prob", str(args.match_prob),
+        "--partial-prob", str(args.partial_prob),
+        "--batch-delay-ms", str(args.batch_delay_ms),
+    ]  # fmt: skip
+    if args.mock_seed is not None:
+        argv += ["--mock-seed", str(args.mock_seed)]
+    return argv
+
+
+def _get(mapping: Dict[str, Any], dotted: str) -> Optional[float]:
+    value: Any = mapping
+    for key in dotted.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    old_name, new_name = old.get("commit") or "old", new.get("commit") or "new"
+    print(f"{'metric':<22} {old_name:>12} {new_name:>12} {'change':>9}")
+    for metric, higher_is_better in COMPARED.items():
+        a, b = _get(old, metric), _get(new, metric)
+        if a is None or b is None:
+            continue
+        change = (b - a) / a * 100 if a else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  worse" if worse and abs(change) >= 5 else ""
+        print(f"{metric:<22} {a:>12.2f} {b:>12.2f} {change:>+8.1f}%{flag}")
+
+
+def main() -> None:
+    cfg = get_settings()
+    parser = argparse.ArgumentParser(description="End-to-end throughput against a mock LLM server")
+    parser.add_argument("--data-root", type=Path, default=Path("data"))
+    parser.add_argument("--scan-source", default=cfg.SCAN_SOURCE)
+    parser.add_argument("--repos", nargs="+", default=None, help="Default: every bundled repo")
+    parser.add_argument("--model", default=cfg.MODEL)
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=cfg.BATCH_SIZE)
+    parser.add_argument("--max-concurrency", type=int, default=cfg.MAX_CONCURRENCY)
+    parser.add_argument("--judge-mode", choices=["single", "multi"], default=cfg.JUDGE_MODE)
+    parser.add_argument("--telemetry", action="store_true", help="Keep Langfuse telemetry enabled")
+    parser.add_argument("--out", type=Path, default=Path("throughput.json"))
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="Earlier results to compare with"
+    )
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    repos = args.repos or _default_repos(args.data_root, args.scan_source)
+    if not repos:
+        raise SystemExit(f"No repos with scan results under {args.data_root}")
+    if not args.telemetry:
+        set_telemetry(False)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "scoring_algo.bench.mock_server", *_mock_argv(args)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = server.stdout.readline().strip() if server.stdout else ""
+        if not line.startswith("listening on "):
+            raise SystemExit(f"Mock server did not start: {line!r}")
+        base_url = line.removeprefix("listening on ")
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ["OPENAI_API_KEY"] = "mock"
+
+        durations = collect_call_durations()
+        get_metrics().reset()
+        repo_s: Dict[str, float] = {}
+        with tempfile.TemporaryDirectory(prefix="throughput-") as output_root:
+            started = time.perf_counter()
+            for repo in repos:
+                repo_started = time.perf_counter()
+                run_evaluation(
+                    repo_name=repo,
+                    data_root=args.data_root,
+                    scan_source=args.scan_source,
+                    output_root=Path(output_root),
+                    model=args.model,
+                    iterations=args.iterations,
+                    batch_size=args.batch_size,
+                    debug_prompt=False,
+                    max_concurrency=args.max_concurrency,
+                    judge_mode=args.judge_mode,
+                )
+                repo_s[repo] = time.perf_counter() - repo_started
+            wall_s = time.perf_counter() - started
+
+        with urllib.request.urlopen(base_url.removesuffix("/v1") + "/stats") as resp:
+            server_stats = json.load(resp)
+    finally:
+        server.terminate()
+        server.wait()
+
+    result = {
+        "commit": _git_commit(),
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "repos": repos,
+            "model": args.model,
+            "iterations": args.iterations,
+            "batch_size": args.batch_size,
+            "max_concurrency": args.max_concurrency,
+            "judge_mode": args.judge_mode,
+            "telemetry": args.telemetry,
+            "mock": vars(config_from_args(args)),
+        },
+        "calls": len(durations),
+        "wall_s": round(wall_s, 3),
+        "calls_per_s": round(len(durations) / wall_s, 3) if wall_s > 0 else 0.0,
+        "call_latency_ms": percentiles(durations, 1000),
+        "repo_latency_s": percentiles(list(repo_s.values())),
+        "repos": {k: round(v, 3) for k, v in repo_s.items()},
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            / (1024 * 1024 if sys.platform == "darwin" else 1024),
+            1,
+        ),
+        "server": server_stats,
+        "metrics": get_metrics().summary(),
+    }
+    args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(
+        f"Wrote {args.out}: calls={result['calls']} calls/s={result['calls_per_s']} "
+        f"call p50/p95/p99={result['call_latency_ms']['p50']}/{result['call_latency_ms']['p95']}/"
+        f"{result['call_latency_ms']['p99']}ms peak_rss={result['peak_rss_mb']}MB"
+    )
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
+import json
+import os
+import sys
 from pathlib import Path
+from typing import Optional
 
 import typer
 from dotenv import load_dotenv
 from rich import print
 
-from .core.evaluate import run_evaluation
+from .core.cache import CacheMode
 from .core.logging_config import configure_logging
-from .core.storage import get_scan_path, get_truth_path
-from .core.telemetry import set_telemetry
-from .generate_report import generate_markdown_report
+from .core.types import RunMode
 from .settings import Settings
 
+# Each command imports what it needs when it runs: the evaluation pulls in openai,
+# langfuse, tiktoken, httpx and rich.progress, which `report` and `--help` have no use
+# for; `report` still loads numpy for its bootstrap intervals, `--help` loads neither.
+# bench/importtime.py keeps those paths within their import-time budget.
+
 app = typer.Typer(help="Scoring Algo CLI")
 
 
@@ -18,7 +25,65 @@ app = typer.Typer(help="Scoring Algo CLI")
 def evaluate(
     no_telemetry: bool = typer.Option(False, "--no-telemetry", help="Disable telemetry"),
     log_level: str = typer.Option("INFO", "--log-level", help="Logging level"),
+    parallel_repos: Optional[int] = typer.Option(
+        None,
+        "--parallel-repos",
+        help="Number of repos evaluated at once (default: MAX_PARALLEL_REPOS)",
+    ),
+    cache_mode: Optional[CacheMode] = typer.Option(
+        None,
+        "--cache",
+        help="LLM verdict cache: off, read, readwrite, or only (fail on miss). Default: CACHE_MODE",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Replay each repo's journal from an interrupted run and only judge the rest",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Reuse the last run's verdicts for truth findings whose candidates did not change",
+    ),
+    run_mode: Optional[RunMode] = typer.Option(
+        None,
+        "--mode",
+        help="interactive, or batch: send each round of LLM calls as one Batch API job. "
+        "Default: RUN_MODE",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Keep a Prometheus text file of the per-stage metrics. Default: METRICS_FILE",
+    ),
+    metrics_port: Optional[int] = typer.Option(
+        None,
+        "--metrics-port",
+        help="Serve the per-stage metrics at http://127.0.0.1:PORT/metrics. Default: METRICS_PORT",
+    ),
+    max_cost: Optional[float] = typer.Option(
+        None, "--max-cost", help="Stop dispatching once the run has cost this many USD"
+    ),
+    max_tokens: Optional[int] = typer.Option(
+        None, "--max-tokens", help="Stop dispatching once the run has used this many tokens"
+    ),
+    max_repo_cost: Optional[float] = typer.Option(
+        None, "--max-repo-cost", help="Per-repo cost cap in USD. Default: MAX_REPO_COST"
+    ),
+    max_repo_tokens: Optional[int] = typer.Option(
+        None, "--max-repo-tokens", help="Per-repo token cap. Default: MAX_REPO_TOKENS"
+    ),
 ):
+    from .core.batch_api import BatchAPIBackend
+    from .core.cache import VerdictCache
+    from .core.evaluate import run_evaluation, run_evaluations
+    from .core.journal import JournalConfigError
+    from .core.ledger import Budget, TokenLedger
+    from .core.llm import provider_of
+    from .core.metrics import PrometheusFileExporter, get_metrics, serve_metrics
+    from .core.storage import ensure_dir, get_scan_path, get_truth_path, write_text_atomic
+    from .core.telemetry import set_telemetry
+
     load_dotenv()
     if no_telemetry:
         set_telemetry(False)
@@ -35,11 +100,53 @@ def evaluate(
     if not output_root.is_absolute():
         output_root = base_dir / output_root
 
-    def run_one(name: str):
-        name = name.replace(".json", "")
-        print(
-            f"[bold green]Running evaluation[/bold green] repo={name} model={cfg.MODEL} iter={cfg.ITERATIONS} batch={cfg.BATCH_SIZE}"  # noqa E501
+    cache: Optional[VerdictCache] = None
+    mode = cache_mode or CacheMode(cfg.CACHE_MODE)
+    if mode != CacheMode.OFF:
+        cache_path = Path(cfg.CACHE_PATH)
+        if not cache_path.is_absolute():
+            cache_path = base_dir / cache_path
+        cache = VerdictCache(cache_path, mode, max_entries=cfg.CACHE_MAX_ENTRIES)
+
+    run_mode = run_mode or RunMode(cfg.RUN_MODE)
+    backend: Optional[BatchAPIBackend] = None
+    if run_mode == RunMode.BATCH:
+        for model in [*cfg.CASCADE_MODELS, cfg.MODEL]:
+            if provider_of(model) != "openai":
+                raise typer.BadParameter(f"Batch mode needs openai models, got {model}")
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise typer.BadParameter("OPENAI_API_KEY is not set")
+        job_dir = Path(cfg.BATCH_API_DIR)
+        if not job_dir.is_absolute():
+            job_dir = base_dir / job_dir
+        backend = BatchAPIBackend(
+            api_key,
+            job_dir,
+            poll_interval=cfg.BATCH_API_POLL_INTERVAL,
+            completion_window=cfg.BATCH_API_COMPLETION_WINDOW,
+            max_retries=cfg.LLM_MAX_RETRIES,
         )
+
+    ledger = TokenLedger.from_settings(
+        cfg.MODEL_PRICES,
+        run_budget=Budget(
+            max_cost=max_cost if max_cost is not None else cfg.MAX_COST,
+            max_tokens=max_tokens if max_tokens is not None else cfg.MAX_TOKENS,
+        ),
+        repo_budget=Budget(
+            max_cost=max_repo_cost if max_repo_cost is not None else cfg.MAX_REPO_COST,
+            max_tokens=max_repo_tokens if max_repo_tokens is not None else cfg.MAX_REPO_TOKENS,
+        ),
+    )
+    if ledger.run_budget.max_cost or ledger.repo_budget.max_cost:
+        # An unpriced model would count as $0 against the cap
+        for model in [*cfg.CASCADE_MODELS, cfg.MODEL]:
+            if model not in ledger.prices:
+                raise typer.BadParameter(f"No MODEL_PRICES entry for {model}; cannot cap cost")
+
+    def repo_job(name: str) -> dict:
+        name = name.replace(".json", "")
         scan_path = get_scan_path(name, data_root, cfg.SCAN_SOURCE)
         truth_path = get_truth_path(name, data_root)
         if not scan_path.exists():
@@ -47,7 +154,7 @@ def evaluate(
         if not truth_path.exists():
             raise typer.BadParameter(f"Truth file not found: {truth_path}")
 
-        run_evaluation(
+        return dict(
             repo_name=name,
             data_root=data_root,
             scan_source=cfg.SCAN_SOURCE,
@@ -56,10 +163,107 @@ def evaluate(
             iterations=cfg.ITERATIONS,
             batch_size=cfg.BATCH_SIZE,
             debug_prompt=cfg.DEBUG_PROMPT,
+            # In batch mode every truth finding goes into each round, not MAX_CONCURRENCY of them
+            max_concurrency=cfg.MAX_CONCURRENCY if backend is None else sys.maxsize,
+            cache=cache,
+            batch_mode=cfg.BATCH_MODE,
+            batch_token_budget=cfg.BATCH_TOKEN_BUDGET,
+            batch_fanout=cfg.BATCH_FANOUT,
+            prompt_layout=cfg.PROMPT_LAYOUT,
+            judge_mode=cfg.JUDGE_MODE,
+            multi_truth_token_budget=cfg.MULTI_TRUTH_TOKEN_BUDGET,
+            rank_candidates=cfg.RANK_CANDIDATES,
+            rank_top_k=cfg.RANK_TOP_K,
+            rank_top_k_only=cfg.RANK_TOP_K_ONLY,
+            contract_pruning=cfg.CONTRACT_PRUNING,
+            resume=resume,
+            incremental=incremental,
+            backend=backend,
+            ledger=ledger,
+            cascade_models=cfg.CASCADE_MODELS,
+            cascade_votes=cfg.CASCADE_VOTES,
         )
 
-    for r in cfg.REPOS_TO_RUN:
-        run_one(r)
+    def run_one(name: str):
+        print(
+            f"[bold green]Running evaluation[/bold green] repo={name.replace('.json', '')} model={cfg.MODEL} iter={cfg.ITERATIONS} batch={cfg.BATCH_SIZE}"  # noqa E501
+        )
+        try:
+            run_evaluation(**repo_job(name))
+        except JournalConfigError as e:
+            print(f"[red]{e}[/red]")
+            raise typer.Exit(code=1)
+
+    def run_parallel(parallel: int):
+        print(
+            f"[bold green]Running evaluation[/bold green] repos={len(cfg.REPOS_TO_RUN)} parallel={parallel} model={cfg.MODEL} iter={cfg.ITERATIONS} batch={cfg.BATCH_SIZE}"  # noqa E501
+        )
+        jobs = []
+        failed: dict[str, Exception] = {}
+        for r in cfg.REPOS_TO_RUN:
+            try:
+                jobs.append(repo_job(r))
+            except typer.BadParameter as e:
+                failed[r.replace(".json", "")] = e
+                print(f"[red]Skipping[/red] repo={r}: {e}")
+
+        for name, err in run_evaluations(jobs, max_parallel=parallel).items():
+            if err is not None:
+                failed[name] = err
+
+        if failed:
+            print(f"[red]{len(failed)} repo(s) failed:[/red] {', '.join(failed)}")
+            raise typer.Exit(code=1)
+
+    metrics = get_metrics()
+    metrics.reset()
+    metrics_path = metrics_file
+    if metrics_path is None and cfg.METRICS_FILE:
+        metrics_path = Path(cfg.METRICS_FILE)
+        if not metrics_path.is_absolute():
+            metrics_path = base_dir / metrics_path
+    exporter = (
+        PrometheusFileExporter(metrics_path, cfg.METRICS_INTERVAL).start()
+        if metrics_path is not None
+        else None
+    )
+    port = metrics_port if metrics_port is not None else cfg.METRICS_PORT
+    metrics_server = serve_metrics(port) if port else None
+    if metrics_server is not None:
+        print(f"[cyan]Metrics[/cyan] serving http://127.0.0.1:{port}/metrics")
+
+    parallel = parallel_repos if parallel_repos is not None else cfg.MAX_PARALLEL_REPOS
+    try:
+        if backend is not None:
+            # Every repo in one event loop, so each round's job holds the calls of all of them
+            try:
+                run_parallel(len(cfg.REPOS_TO_RUN))
+            finally:
+                print(f"[cyan]Batch API[/cyan] {backend.stats.summary()}")
+        elif parallel <= 1 or len(cfg.REPOS_TO_RUN) <= 1:
+            for r in cfg.REPOS_TO_RUN:
+                run_one(r)
+        else:
+            run_parallel(parallel)
+    finally:
+        if cache is not None:
+            cache.close()
+        if exporter is not None:
+            exporter.stop()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        ensure_dir(output_root)
+        summary_path = output_root / "run_metrics.json"
+        write_text_atomic(summary_path, json.dumps(metrics.summary(), indent=2))
+        print(f"[cyan]Metrics[/cyan] {metrics.summary_line()} -> {summary_path}")
+        ledger_path = output_root / "run_ledger.json"
+        ledger.write(ledger_path)
+        print(f"[cyan]Ledger[/cyan] {ledger.total.summary()} -> {ledger_path}")
+        if ledger.unevaluated:
+            print(
+                "[yellow]Not evaluated (budget)[/yellow] "
+                + ", ".join(f"{repo}={n}" for repo, n in ledger.unevaluated.items())
+            )
 
 
 @app.command("report")
@@ -71,10 +275,36 @@ def report(
     scan_root: Path = typer.Option(
         Path("../data/baseline"), "--scan-root", help="Path to scan results root"
     ),
+    json_out: Optional[Path] = typer.Option(None, "--json", help="Also write the stats as JSON"),
+    csv_out: Optional[Path] = typer.Option(None, "--csv", help="Also write the stats as CSV"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Recompute every repo and skip the stats cache"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", help="Worker processes for stale repos (default: CPUs)"
+    ),
+    bootstrap: int = typer.Option(
+        1000,
+        "--bootstrap",
+        help="Bootstrap resamples for the 95% confidence intervals (0 to disable)",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for the bootstrap resamples"),
 ):
+    from .generate_report import generate_markdown_report
+
     load_dotenv()
     configure_logging("INFO")
-    generate_markdown_report(benchmarks=benchmarks, out=out, scan_root=scan_root)
+    generate_markdown_report(
+        benchmarks=benchmarks,
+        out=out,
+        scan_root=scan_root,
+        json_out=json_out,
+        csv_out=csv_out,
+        use_cache=not no_cache,
+        workers=workers,
+        bootstrap=bootstrap,
+        seed=seed,
+    )
 
 
 if __name__ == "__main__":
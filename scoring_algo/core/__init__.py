@@ -5,11 +5,24 @@ LLM integration, and telemetry wrappers.
 """
 
 __all__ = [
+    "backends",
+    "batch_api",
     "batching",
+    "bootstrap",
+    "cache",
+    "cascade",
+    "contracts",
     "evaluate",
+    "incremental",
     "iteration",
+    "journal",
+    "jsonstream",
+    "ledger",
     "llm",
+    "metrics",
     "prompt",
+    "ranking",
+    "scheduler",
     "storage",
     "telemetry",
     "types",
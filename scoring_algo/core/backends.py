@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .ranking import tokenize
+from .types import MultiFinding
+
+M = TypeVar("M", bound=BaseModel)
+
+# Fenced JSON blocks of a rendered prompt; the truth block of the single-truth
+# layouts closes with " ```"
+_JSON_BLOCK = re.compile(r"```json\n(.*?)\n\s*```", re.DOTALL)
+
+
+@dataclass
+class BackendResponse:
+    parsed: Optional[BaseModel]
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    # Time spent reading and validating the response, included in the call's duration
+    parse_s: float = 0.0
+
+
+class LLMBackend(Protocol):
+    """What `LLMClient` needs from a provider: one structured-output call.
+
+    Retries, rate limits, caching and voting stay in `LLMClient` and the request
+    scheduler, so every backend goes through the same stack. A backend may set
+    `scheduled = False` to have its calls bypass the request scheduler, and
+    `price_factor` when its calls are billed below the model's list price.
+    """
+
+    async def parse(self, model: str, prompt: str, text_format: Type[M]) -> BackendResponse: ...
+
+
+@dataclass
+class FixtureRule:
+    truth: str
+    finding: str
+    verdict: str  # "match" or "partial"
+
+
+def load_fixture(path: Path) -> List[FixtureRule]:
+    """Read a fixture file: a JSON list of {"truth", "finding", "verdict"} rules.
+
+    `truth` and `finding` are case-insensitive substrings of the truth finding's
+    Issue and of the junior finding's Issue or Description.
+    """
+    rules = json.loads(path.read_text(encoding="utf-8"))
+    out = []
+    for rule in rules:
+        verdict = rule.get("verdict", "match")
+        if verdict not in ("match", "partial"):
+            raise ValueError(f"Unknown fixture verdict {verdict!r} in {path}")
+        out.append(FixtureRule(rule["truth"].lower(), rule["finding"].lower(), verdict))
+    return out
+
+
+def _text(item: Dict[str, Any]) -> str:
+    contracts = " ".join(item.get("Contracts") or [])
+    return " ".join([str(item.get("Issue", "")), str(item.get("Description", "")), contracts])
+
+
+def _prompt_parts(prompt: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """The truth findings and the junior findings embedded in a rendered prompt."""
+    truths: List[Dict[str, Any]] = []
+    junior: List[Dict[str, Any]] = []
+    for block in _JSON_BLOCK.findall(prompt):
+        try:
+            value = json.loads(block)
+        except json.JSONDecodeError:
+            # The output-format example is not strict JSON
+            continue
+        if isinstance(value, dict) and "Issue" in value:
+            truths = [value]
+        elif isinstance(value, list) and value and "truth_id" in value[0]:
+            truths = value
+        elif isinstance(value, list):
+            junior = value
+    return truths, junior
+
+
+class LocalBackend:
+    """Deterministic offline backend: verdicts from lexical rules or a fixture file.
+
+    Without a fixture, a truth finding matches the junior finding whose distinct
+    tokens overlap most with its own (Jaccard), when that overlap reaches
+    `match_threshold` (`partial_threshold` for a partial match). With a fixture, only
+    the pairs it lists match. Each call sleeps `latency_ms` plus up to `jitter_ms`,
+    derived from the prompt so repeated runs take the same time.
+    """
+
+    def __init__(
+        self,
+        fixture: Optional[Path] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        match_threshold: float = 0.2,
+        partial_threshold: float = 0.15,
+    ):
+        self.rules = load_fixture(fixture) if fixture is not None else None
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.match_threshold = match_threshold
+        self.partial_threshold = partial_threshold
+
+    async def parse(self, model: str, prompt: str, text_format: Type[M]) -> BackendResponse:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        delay = self.latency_ms + self.jitter_ms * (int.from_bytes(digest[:4], "big") / 2**32)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        truths, junior = _prompt_parts(prompt)
+        if issubclass(text_format, MultiFinding):
+            payload: Dict[str, Any] = {
+                "verdicts": [dict(self._verdict(t, junior), truth_id=t["truth_id"]) for t in truths]
+            }
+        else:
+            payload = self._verdict(truths[0] if truths else {}, junior)
+        started = time.perf_counter()
+        parsed = text_format.model_validate(payload)
+        return BackendResponse(
+            parsed=parsed,
+            input_tokens=len(prompt) // 4,
+            output_tokens=len(parsed.model_dump_json()) // 4,
+            parse_s=time.perf_counter() - started,
+        )
+
+    def _verdict(self, truth: Dict[str, Any], junior: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.rules is not None:
+            kind, index = self._fixture_match(truth, junior)
+        else:
+            kind, index = self._rule_match(truth, junior)
+        chosen = junior[index] if index >= 0 else {}
+        return {
+            "is_match": kind == "match",
+            "is_partial_match": kind == "partial",
+            "explanation": f"local backend: {kind or 'no'} match",
+            "severity_from_junior_auditor": str(chosen.get("Severity") or "N/A"),
+            "severity_from_truth": str(truth.get("Severity") or "N/A"),
+            "index_of_finding_from_junior_auditor": index,
+        }
+
+    def _rule_match(
+        self, truth: Dict[str, Any], junior: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], int]:
+        truth_tokens = set(tokenize(_text(truth)))
+        best, best_score = -1, 0.0
+        for i, item in enumerate(junior):
+            tokens = set(tokenize(_text(item)))
+            union = len(truth_tokens | tokens)
+            score = len(truth_tokens & tokens) / union if union else 0.0
+            if score > best_score:
+                best, best_score = i, score
+        if best_score >= self.match_threshold:
+            return "match", best
+        if best_score >= self.partial_threshold:
+            return "partial", best
+        return None, -1
+
+    def _fixture_match(
+        self, truth: Dict[str, Any], junior: List[Dict[str, Any]]
+    ) -> Tuple[Optional[str], int]:
+        issue = str(truth.get("Issue", "")).lower()
+        partial: Tuple[Optional[str], int] = (None, -1)
+        for rule in self.rules or []:
+            if rule.truth not in issue:
+                continue
+            for i, item in enumerate(junior):
+                text = f"{item.get('Issue', '')}\n{item.get('Description', '')}".lower()
+                if rule.finding not in text:
+                    continue
+                if rule.verdict == "match":
+                    return "match", i
+                if partial[1] < 0:
+                    partial = ("partial", i)
+        return partial
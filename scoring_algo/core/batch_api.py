@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from rich import print
+
+from .backends import BackendResponse
+from .llm import PromptTooLongError, get_shared_client
+from .metrics import get_metrics
+from .scheduler import get_scheduler
+from .storage import ensure_dir, write_text_atomic
+
+M = TypeVar("M", bound=BaseModel)
+
+BATCH_ENDPOINT = "/v1/responses"
+_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchRequestError(RuntimeError):
+    """A request of a batch job came back without a usable response."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class BatchAPIStats:
+    rounds: int = 0
+    requests: int = 0
+    retried: int = 0
+    failed: int = 0
+    wait_s: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"rounds={self.rounds} requests={self.requests} retried={self.retried} "
+            f"failed={self.failed} waited={self.wait_s:.0f}s"
+        )
+
+
+@dataclass
+class _Pending:
+    custom_id: str
+    model: str
+    prompt: str
+    text_format: Type[BaseModel]
+    future: "asyncio.Future[BackendResponse]" = field(repr=False)
+    attempts: int = 0
+
+
+class BatchAPIBackend:
+    """Collects LLM calls into Batch API jobs, one job per round.
+
+    The evaluation runs unchanged: every call waits on a future instead of an HTTP
+    response. Once no new call has arrived for `settle_s`, i.e. every truth finding is
+    waiting on the provider, the pending calls are written to a JSONL batch file,
+    submitted, polled until the job ends, and their futures resolved. Whatever the
+    evaluation asks for next (third votes, the next batch after a non-match, halves of
+    a batch that did not fit) forms the next round, together with the calls that failed
+    with a retryable error (429, 5xx, or no result before the job ended), up to
+    `max_retries` times each.
+    """
+
+    # Requests are queued into the job rather than sent, so the rate limiter and the
+    # in-flight limit do not apply to them
+    scheduled = False
+    # Batch API requests are billed at half the interactive price
+    price_factor = 0.5
+
+    def __init__(
+        self,
+        api_key: str,
+        job_dir: Path,
+        poll_interval: float = 30.0,
+        completion_window: str = "24h",
+        max_retries: int = 6,
+        settle_s: float = 0.2,
+    ):
+        self._api_key = api_key
+        self.job_dir = job_dir
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.max_retries = max_retries
+        self.settle_s = settle_s
+        self.stats = BatchAPIStats()
+        self._pending: List[_Pending] = []
+        self._next_id = 0
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def parse(self, model: str, prompt: str, text_format: Type[M]) -> BackendResponse:
+        loop = asyncio.get_running_loop()
+        request = _Pending(
+            custom_id=f"req-{self._next_id}",
+            model=model,
+            prompt=prompt,
+            text_format=text_format,
+            future=loop.create_future(),
+        )
+        self._next_id += 1
+        self._pending.append(request)
+        get_metrics().gauge("batch_pending").set(len(self._pending))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_when_settled())
+        return await request.future
+
+    async def _flush_when_settled(self) -> None:
+        seen = -1
+        while self._pending:
+            await asyncio.sleep(self.settle_s)
+            if len(self._pending) != seen:
+                seen = len(self._pending)
+                continue
+            # Calls cancelled while queued (e.g. by a batch fan-out) are not sent
+            requests = [r for r in self._pending if not r.future.done()]
+            self._pending = []
+            get_metrics().gauge("batch_pending").set(0)
+            seen = -1
+            if requests:
+                try:
+                    await self._run_round(requests)
+                except Exception as e:
+                    for r in requests:
+                        if not r.future.done():
+                            r.future.set_exception(e)
+
+    async def _run_round(self, requests: List[_Pending]) -> None:
+        self.stats.rounds += 1
+        self.stats.requests += len(requests)
+        round_no = self.stats.rounds
+        ensure_dir(self.job_dir)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        input_path = self.job_dir / f"{stamp}_round{round_no:03d}.jsonl"
+        write_text_atomic(input_path, "".join(_request_line(r) + "\n" for r in requests))
+
+        client = get_shared_client(self._api_key)
+        scheduler = get_scheduler()
+        started = time.monotonic()
+        data = input_path.read_bytes()
+        upload = await scheduler.run(
+            lambda: client.files.create(file=(input_path.name, data), purpose="batch"),
+            tokens=0,
+        )
+        job = await scheduler.run(
+            lambda: client.batches.create(
+                input_file_id=upload.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self.completion_window,
+            ),
+            tokens=0,
+        )
+        print(f"[cyan]Batch round[/cyan] {round_no} job={job.id} requests={len(requests)}")
+        while job.status not in _FINAL_STATUSES:
+            await asyncio.sleep(self.poll_interval)
+            job = await scheduler.run(lambda: client.batches.retrieve(job.id), tokens=0)
+        elapsed = time.monotonic() - started
+        self.stats.wait_s += elapsed
+
+        lines: List[str] = []
+        for file_id in (job.output_file_id, job.error_file_id):
+            if file_id:
+                content = await scheduler.run(lambda: client.files.content(file_id), tokens=0)
+                lines.extend(content.text.splitlines())
+        output_path = input_path.with_name(input_path.stem + ".output.jsonl")
+        write_text_atomic(output_path, "".join(line + "\n" for line in lines))
+
+        by_id = {r.custom_id: r for r in requests}
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            request = by_id.pop(record.get("custom_id"), None)
+            if request is None or request.future.done():
+                continue
+            try:
+                request.future.set_result(_parse_result(record, request.text_format))
+            except Exception as e:
+                self._retry_or_fail(request, e)
+        for request in by_id.values():
+            if not request.future.done():
+                self._retry_or_fail(
+                    request,
+                    BatchRequestError(
+                        f"No result for {request.custom_id} (job {job.status})", retryable=True
+                    ),
+                )
+        print(
+            f"[cyan]Batch round[/cyan] {round_no} job={job.id} status={job.status} "
+            f"in {elapsed:.0f}s"
+        )
+
+    def _retry_or_fail(self, request: _Pending, error: Exception) -> None:
+        if getattr(error, "retryable", False) and request.attempts < self.max_retries:
+            request.attempts += 1
+            self.stats.retried += 1
+            self._pending.append(request)
+            get_metrics().gauge("batch_pending").set(len(self._pending))
+            return
+        self.stats.failed += 1
+        request.future.set_exception(error)
+
+
+def _strict_schema(schema: Any) -> Any:
+    """The JSON schema in the form Structured Outputs' strict mode accepts.
+
+    Every object gets `additionalProperties: false` and lists all its properties as
+    required; `$defs`, properties, items and combinators are converted recursively.
+    """
+    if isinstance(schema, list):
+        return [_strict_schema(s) for s in schema]
+    if not isinstance(schema, dict):
+        return schema
+    out = {k: _strict_schema(v) for k, v in schema.items() if not (k == "default" and v is None)}
+    if out.get("type") == "object" and "properties" in out:
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+def _text_format(text_format: Type[BaseModel]) -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "strict": True,
+        "name": text_format.__name__,
+        "schema": _strict_schema(text_format.model_json_schema()),
+    }
+
+
+def _request_line(request: _Pending) -> str:
+    return json.dumps(
+        {
+            "custom_id": request.custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": request.model,
+                "input": [{"role": "user", "content": request.prompt}],
+                "text": {"format": _text_format(request.text_format)},
+            },
+        }
+    )
+
+
+def _parse_result(record: Dict[str, Any], text_format: Type[M]) -> BackendResponse:
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") != 200 or record.get("error"):
+        error = record.get("error") or body.get("error") or {}
+        code = error.get("code") or ""
+        message = error.get("message") or ""
+        if code == "context_length_exceeded" or "context length" in message.lower():
+            # Lets the evaluation split the batch, which then goes out in the next round
+            raise PromptTooLongError(message)
+        status = response.get("status_code") or 0
+        raise BatchRequestError(
+            f"{code or status}: {message}", retryable=status == 429 or status >= 500
+        )
+    started = time.perf_counter()
+    text = ""
+    for item in body.get("output") or []:
+        if item.get("type") != "message":
+            continue
+        for part in item.get("content") or []:
+            if part.get("type") == "output_text":
+                text += part.get("text", "")
+    usage = body.get("usage") or {}
+    parsed = text_format.model_validate_json(text)
+    return BackendResponse(
+        parsed=parsed,
+        input_tokens=usage.get("input_tokens") or 0,
+        cached_input_tokens=(usage.get("input_tokens_details") or {}).get("cached_tokens") or 0,
+        output_tokens=usage.get("output_tokens") or 0,
+        reasoning_tokens=(usage.get("output_tokens_details") or {}).get("reasoning_tokens") or 0,
+        parse_s=time.perf_counter() - started,
+    )
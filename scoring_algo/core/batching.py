@@ -2,18 +2,106 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+import re
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 from .iteration import get_best_response
-from .llm import LLMClient
-from .prompt import CALCULATE_PROMPT
+from .llm import LLMClient, PromptTooLongError, count_tokens
+from .metrics import get_metrics
+from .prompt import CALCULATE_MULTI_PROMPT, PROMPT_LAYOUTS
 from .storage import store_debug_prompt
-from .types import Finding, Vulnerability, WorkingResult
+from .types import Finding, MultiFinding, Vulnerability, WorkingResult
+
+logger = logging.getLogger(__name__)
+
+
+class Batch(list):
+    """A list of working-set records that keeps its prompt JSON once rendered.
+
+    Batches are built once per repo and sent for every truth finding, so their JSON
+    only needs to be assembled once; see `batch_json`.
+    """
+
+    __slots__ = ("_json",)
+    _json: Optional[str]
+
+
+def batch_json(batch: List[WorkingResult]) -> str:
+    """`json.dumps([item, ...], indent=2)` of the batch's prompt items, cached on `Batch`es."""
+    cached = getattr(batch, "_json", None)
+    if cached is not None:
+        return cached
+    if not batch:
+        text = "[]"
+    else:
+        text = "[\n" + ",\n".join(b.nested_prompt_json(i) for i, b in enumerate(batch)) + "\n]"
+    if isinstance(batch, Batch):
+        batch._json = text
+    return text
+
+
+class _SplitTemplate:
+    """A prompt template split once at its placeholders, so rendering is a single join.
+
+    Renders the same text as chaining `str.replace` for each placeholder.
+    """
+
+    def __init__(self, template: str, placeholders: List[str]):
+        pattern = re.compile("|".join(re.escape("{" + p + "}") for p in placeholders))
+        self._pieces: List[str] = []
+        self._slots: List[str] = []
+        start = 0
+        for m in pattern.finditer(template):
+            self._pieces.append(template[start : m.start()])  # noqa: E203
+            self._slots.append(m.group()[1:-1])
+            start = m.end()
+        self._pieces.append(template[start:])
+
+    def render(self, **values: str) -> str:
+        parts = [self._pieces[0]]
+        for slot, piece in zip(self._slots, self._pieces[1:]):
+            parts.append(values[slot])
+            parts.append(piece)
+        return "".join(parts).strip()
+
+
+_TEMPLATES = {
+    layout: _SplitTemplate(template, ["truth_finding", "junior_findings"])
+    for layout, template in PROMPT_LAYOUTS.items()
+}
+_MULTI_TEMPLATE = _SplitTemplate(CALCULATE_MULTI_PROMPT, ["junior_findings", "truth_findings"])
 
 
 def build_batches(findings: List[WorkingResult], batch_size: int) -> List[List[WorkingResult]]:
-    return [findings[i : i + batch_size] for i in range(0, len(findings), batch_size)]  # noqa: E203
+    return [
+        Batch(findings[i : i + batch_size])  # noqa: E203
+        for i in range(0, len(findings), batch_size)
+    ]
+
+
+def build_token_batches(
+    findings: List[WorkingResult], token_budget: int
+) -> List[List[WorkingResult]]:
+    """Pack consecutive findings into batches whose serialized size stays within `token_budget`.
+
+    A finding that is larger than the budget on its own still gets a batch of its own.
+    """
+    batches: List[List[WorkingResult]] = []
+    current: List[WorkingResult] = Batch()
+    current_tokens = 0
+    for b in findings:
+        tokens = count_tokens(b.prompt_json(len(current)))
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current, current_tokens = Batch(), 0
+        current.append(b)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
 
 
 async def process_in_batches(
@@ -25,39 +113,58 @@ async def process_in_batches(
     batch_size: int,
     debug_prompt: bool,
     output_root: Path,
+    client: Optional[LLMClient] = None,
+    batches: Optional[List[List[WorkingResult]]] = None,
+    fanout: int = 1,
+    prompt_layout: str = "default",
 ) -> Optional[Finding]:
-    batches = build_batches(all_findings, batch_size)
-    client = LLMClient(model)
+    """Judge one truth finding against the working set, batch by batch.
 
-    current_best: Optional[Finding] = None
+    `batches` may be passed when the caller has already partitioned `all_findings`
+    (in order, e.g. with `build_token_batches`); otherwise fixed `batch_size` slices
+    are used. With `fanout` other than 1 the batches are sent concurrently, see
+    `_process_batches_fanout`.
+    """
+    if batches is None:
+        batches = build_batches(all_findings, batch_size)
+    if client is None:
+        client = LLMClient(model)
+    truth_json = truth_finding.model_dump_json(indent=2)
 
-    for batch_number, batch in enumerate(batches):
-        working_results = [
-            {
-                "Issue": b.Issue,
-                "Category": b.Category.value if hasattr(b.Category, "value") else b.Category,
-                "Description": b.Description,
-                "Contracts": b.Contracts,
-                "Severity": b.Severity.value if hasattr(b.Severity, "value") else b.Severity,
-                "Index": i,
-            }
-            for i, b in enumerate(batch)
-        ]
+    if fanout != 1:
+        return await _process_batches_fanout(
+            client=client,
+            truth_finding=truth_finding,
+            truth_json=truth_json,
+            batches=batches,
+            fanout=fanout,
+            iterations=iterations,
+            repo_name=repo_name,
+            debug_prompt=debug_prompt,
+            output_root=output_root,
+            prompt_layout=prompt_layout,
+        )
 
-        prompt = _build_prompt(truth_finding, working_results)
-        if debug_prompt:
-            store_debug_prompt(prompt, repo_name, output_root)
+    current_best: Optional[Finding] = None
 
-        responses: List[Finding] = await _generate_responses_for_prompt(
-            client=client, prompt=prompt, iterations=iterations
+    offset = 0
+    for batch in batches:
+        content = await _judge_batch(
+            client=client,
+            truth_finding=truth_finding,
+            truth_json=truth_json,
+            batch=batch,
+            offset=offset,
+            iterations=iterations,
+            repo_name=repo_name,
+            debug_prompt=debug_prompt,
+            output_root=output_root,
+            prompt_layout=prompt_layout,
         )
-        if not responses:
+        offset += len(batch)
+        if content is None:
             continue
 
-        content = get_best_response(responses, len(responses))
-
-        _apply_index_offset(content, batch_number, batch_size)
-
         if current_best is None:
             current_best = content
 
@@ -69,6 +176,333 @@ async def process_in_batches(
     return current_best
 
 
+async def _process_batches_fanout(
+    client: LLMClient,
+    truth_finding: Vulnerability,
+    truth_json: str,
+    batches: List[List[WorkingResult]],
+    fanout: int,
+    iterations: int,
+    repo_name: str,
+    debug_prompt: bool,
+    output_root: Path,
+    prompt_layout: str = "default",
+) -> Optional[Finding]:
+    """Judge batches concurrently in waves of `fanout` (all at once when `fanout <= 0`).
+
+    Once a batch returns an exact match, batches after it in the wave are cancelled
+    and later waves are not sent. Batches before it keep running, since an earlier
+    exact match would take precedence in the sequential order.
+    """
+    width = len(batches) if fanout <= 0 else fanout
+    offsets = [0]
+    for batch in batches[:-1]:
+        offsets.append(offsets[-1] + len(batch))
+
+    contents: List[Optional[Finding]] = [None] * len(batches)
+    cancelled = 0
+    skipped = 0
+    for wave_start in range(0, len(batches), width):
+        tasks = {
+            asyncio.create_task(
+                _judge_batch(
+                    client=client,
+                    truth_finding=truth_finding,
+                    truth_json=truth_json,
+                    batch=batches[i],
+                    offset=offsets[i],
+                    iterations=iterations,
+                    repo_name=repo_name,
+                    debug_prompt=debug_prompt,
+                    output_root=output_root,
+                    prompt_layout=prompt_layout,
+                )
+            ): i
+            for i in range(wave_start, min(wave_start + width, len(batches)))
+        }
+        first_exact: Optional[int] = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = tasks[task]
+                    content = task.result()
+                    contents[i] = content
+                    if content is not None and content.is_match:
+                        first_exact = i if first_exact is None else min(first_exact, i)
+                if first_exact is not None:
+                    # Later batches can no longer change the outcome
+                    obsolete = {t for t in pending if tasks[t] > first_exact}
+                    for task in obsolete:
+                        task.cancel()
+                    await asyncio.gather(*obsolete, return_exceptions=True)
+                    cancelled += len(obsolete)
+                    pending -= obsolete
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the cancellations land and retrieve their exceptions
+            await asyncio.gather(*pending, return_exceptions=True)
+        if first_exact is not None:
+            skipped = len(batches) - (wave_start + len(tasks))
+            break
+
+    if cancelled or skipped:
+        logger.info(
+            "[%s] exact match found: cancelled %d in-flight batch request(s), skipped %d batch(es)",
+            repo_name,
+            cancelled,
+            skipped,
+        )
+    return _select_in_batch_order(contents)
+
+
+def _select_in_batch_order(contents: List[Optional[Finding]]) -> Optional[Finding]:
+    # Same priority as the sequential walk: the first exact match, else the first
+    # partial match, else the first verdict received
+    judged = [c for c in contents if c is not None]
+    for content in judged:
+        if content.is_match:
+            return content
+    for content in judged:
+        if content.is_partial_match:
+            return content
+    return judged[0] if judged else None
+
+
+async def _judge_batch(
+    client: LLMClient,
+    truth_finding: Vulnerability,
+    batch: List[WorkingResult],
+    offset: int,
+    iterations: int,
+    repo_name: str,
+    debug_prompt: bool,
+    output_root: Path,
+    prompt_layout: str = "default",
+    truth_json: Optional[str] = None,
+) -> Optional[Finding]:
+    """Vote on one batch; `offset` is the batch's position in the working set.
+
+    If the prompt does not fit in the model's context, the batch is split in half
+    and both halves are judged in order, as if they had been two batches.
+    """
+    if truth_json is None:
+        truth_json = truth_finding.model_dump_json(indent=2)
+    with get_metrics().timer("prompt_build"):
+        prompt = build_prompt(truth_json, batch_json(batch), prompt_layout)
+    if debug_prompt:
+        store_debug_prompt(prompt, repo_name, output_root)
+
+    try:
+        responses: List[Finding] = await _generate_responses_for_prompt(
+            client=client, prompt=prompt, iterations=iterations
+        )
+    except PromptTooLongError:
+        if len(batch) <= 1:
+            print(f"[LLMPrompt] Prompt too long even for a single finding (offset {offset})")
+            return None
+        mid = len(batch) // 2
+        halves = ((batch[:mid], offset), (batch[mid:], offset + mid))
+        best: Optional[Finding] = None
+        for half, half_offset in halves:
+            content = await _judge_batch(
+                client=client,
+                truth_finding=truth_finding,
+                truth_json=truth_json,
+                batch=half,
+                offset=half_offset,
+                iterations=iterations,
+                repo_name=repo_name,
+                debug_prompt=debug_prompt,
+                output_root=output_root,
+                prompt_layout=prompt_layout,
+            )
+            if content is None:
+                continue
+            if content.is_match:
+                return content
+            if best is None or (content.is_partial_match and not best.is_partial_match):
+                best = content
+        return best
+
+    if not responses:
+        return None
+
+    with get_metrics().timer("vote"):
+        content = get_best_response(responses, len(responses))
+    _apply_index_offset(content, offset)
+    return content
+
+
+async def process_truths_multi(
+    truths: List[Vulnerability],
+    all_findings: List[WorkingResult],
+    repo_name: str,
+    model: str,
+    iterations: int,
+    batch_size: int,
+    debug_prompt: bool,
+    output_root: Path,
+    client: Optional[LLMClient] = None,
+    batches: Optional[List[List[WorkingResult]]] = None,
+    truth_token_budget: int = 6000,
+    on_truth_done: Optional[Callable[[int, Optional[Finding]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> List[Optional[Finding]]:
+    """Judge every truth finding against each batch, packing several truth findings per call.
+
+    Returns one verdict per truth finding, in truth order. The per-truth verdicts of a
+    call are voted on and combined across batches exactly like `process_in_batches`
+    does for a single truth finding: a truth finding stops being sent once it gets an
+    exact match, otherwise its first partial (or first verdict) is kept.
+    `on_truth_done` is called with the truth index and verdict once the verdict is final.
+    When `should_stop` returns True before a batch, the walk ends there: truth findings
+    without an exact match by then get no verdict and `on_truth_done` is not called
+    for them.
+    """
+    if batches is None:
+        batches = build_batches(all_findings, batch_size)
+    if client is None:
+        client = LLMClient(model)
+
+    truth_tokens = [count_tokens(t.model_dump_json(indent=2)) for t in truths]
+    best: List[Optional[Finding]] = [None] * len(truths)
+    resolved = [False] * len(truths)
+
+    offset = 0
+    for batch in batches:
+        pending = [i for i in range(len(truths)) if not resolved[i]]
+        if not pending:
+            break
+        if should_stop is not None and should_stop():
+            return [best[i] if resolved[i] else None for i in range(len(truths))]
+        packs = _pack_truths(pending, truth_tokens, truth_token_budget)
+        pack_verdicts = await asyncio.gather(
+            *(
+                _judge_truth_pack(
+                    client=client,
+                    truths=truths,
+                    pack=pack,
+                    batch=batch,
+                    offset=offset,
+                    iterations=iterations,
+                    repo_name=repo_name,
+                    debug_prompt=debug_prompt,
+                    output_root=output_root,
+                )
+                for pack in packs
+            )
+        )
+        offset += len(batch)
+
+        for verdicts in pack_verdicts:
+            for i, content in verdicts.items():
+                if content is None:
+                    continue
+                current_best = best[i]
+                if current_best is None:
+                    best[i] = current_best = content
+                if content.is_match:
+                    best[i] = content
+                    resolved[i] = True
+                    if on_truth_done is not None:
+                        on_truth_done(i, content)
+                elif content.is_partial_match and not current_best.is_partial_match:
+                    best[i] = content
+
+    if on_truth_done is not None:
+        for i in range(len(truths)):
+            if not resolved[i]:
+                on_truth_done(i, best[i])
+    return best
+
+
+def _pack_truths(pending: List[int], truth_tokens: List[int], token_budget: int) -> List[List[int]]:
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i in pending:
+        if current and current_tokens + truth_tokens[i] > token_budget:
+            packs.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += truth_tokens[i]
+    if current:
+        packs.append(current)
+    return packs
+
+
+async def _judge_truth_pack(
+    client: LLMClient,
+    truths: List[Vulnerability],
+    pack: List[int],
+    batch: List[WorkingResult],
+    offset: int,
+    iterations: int,
+    repo_name: str,
+    debug_prompt: bool,
+    output_root: Path,
+) -> Dict[int, Optional[Finding]]:
+    """Vote on one batch for the truth findings in `pack`; returns a verdict per truth index.
+
+    A pack whose prompt does not fit in the context is split in half; a single truth
+    finding that still does not fit falls back to `_judge_batch`, which splits the batch.
+    """
+    with get_metrics().timer("prompt_build"):
+        prompt = _build_multi_prompt([truths[i] for i in pack], batch_json(batch))
+    if debug_prompt:
+        store_debug_prompt(prompt, repo_name, output_root)
+
+    try:
+        per_truth = await _generate_multi_responses_for_prompt(
+            client=client, prompt=prompt, n_truths=len(pack), iterations=iterations
+        )
+    except PromptTooLongError:
+        if len(pack) == 1:
+            content = await _judge_batch(
+                client=client,
+                truth_finding=truths[pack[0]],
+                batch=batch,
+                offset=offset,
+                iterations=iterations,
+                repo_name=repo_name,
+                debug_prompt=debug_prompt,
+                output_root=output_root,
+            )
+            return {pack[0]: content}
+        mid = len(pack) // 2
+        out: Dict[int, Optional[Finding]] = {}
+        for half in (pack[:mid], pack[mid:]):
+            out.update(
+                await _judge_truth_pack(
+                    client=client,
+                    truths=truths,
+                    pack=half,
+                    batch=batch,
+                    offset=offset,
+                    iterations=iterations,
+                    repo_name=repo_name,
+                    debug_prompt=debug_prompt,
+                    output_root=output_root,
+                )
+            )
+        return out
+
+    verdicts: Dict[int, Optional[Finding]] = {}
+    for truth_id, i in enumerate(pack):
+        responses = per_truth[truth_id]
+        if not responses:
+            verdicts[i] = None
+            continue
+        with get_metrics().timer("vote"):
+            content = get_best_response(responses, len(responses))
+        _apply_index_offset(content, offset)
+        verdicts[i] = content
+    return verdicts
+
+
 def _agree(a: Finding, b: Finding) -> bool:
     if a.is_match and b.is_match:
         return True
@@ -82,8 +516,23 @@ def _agree(a: Finding, b: Finding) -> bool:
 async def _generate_responses_for_prompt(
     client: LLMClient, prompt: str, iterations: int
 ) -> List[Finding]:
+    if client.cascade is None:
+        return await _vote_on_prompt(client, prompt, iterations)
+    settled = await client.cascade.screen(prompt, Finding, lambda r: [r])
+    if settled is not None:
+        return [vote[0] for vote in settled]
+    started = time.perf_counter()
+    responses = await _vote_on_prompt(client, prompt, iterations)
+    client.cascade.record_final(client.model, time.perf_counter() - started)
+    return responses
+
+
+async def _vote_on_prompt(client: LLMClient, prompt: str, iterations: int) -> List[Finding]:
     async def _run_two() -> List[Finding]:
-        r1, r2 = await asyncio.gather(client.generate_async(prompt), client.generate_async(prompt))
+        r1, r2 = await asyncio.gather(
+            client.generate_async(prompt, vote=0, text_format=Finding),
+            client.generate_async(prompt, vote=1, text_format=Finding),
+        )
         out: List[Finding] = []
         if r1:
             out.append(r1)
@@ -93,7 +542,7 @@ async def _generate_responses_for_prompt(
 
     responses: List[Finding] = []
     if iterations <= 1:
-        r = await client.generate_async(prompt)
+        r = await client.generate_async(prompt, vote=0, text_format=Finding)
         if r:
             responses.append(r)
     elif iterations == 2:
@@ -105,23 +554,95 @@ async def _generate_responses_for_prompt(
         if len(first_two) == 2 and _agree(first_two[0], first_two[1]):
             need_third = False
         if need_third:
-            r3 = await client.generate_async(prompt)
+            r3 = await client.generate_async(prompt, vote=2, text_format=Finding)
             if r3:
                 responses.append(r3)
     return responses
 
 
-def _apply_index_offset(content: Finding, batch_number: int, batch_size: int) -> None:
+async def _generate_multi_responses_for_prompt(
+    client: LLMClient, prompt: str, n_truths: int, iterations: int
+) -> List[List[Finding]]:
+    if client.cascade is None:
+        return await _vote_on_multi_prompt(client, prompt, n_truths, iterations)
+    settled = await client.cascade.screen(
+        prompt, MultiFinding, lambda r: _split_verdicts(r, n_truths)
+    )
+    if settled is not None:
+        return [[vote[truth_id] for vote in settled] for truth_id in range(n_truths)]
+    started = time.perf_counter()
+    per_truth = await _vote_on_multi_prompt(client, prompt, n_truths, iterations)
+    client.cascade.record_final(client.model, time.perf_counter() - started)
+    return per_truth
+
+
+async def _vote_on_multi_prompt(
+    client: LLMClient, prompt: str, n_truths: int, iterations: int
+) -> List[List[Finding]]:
+    # Same voting as _generate_responses_for_prompt, per truth finding: the third
+    # vote is only counted for truth findings whose first two votes disagree.
+    async def _vote(vote: int) -> List[Optional[Finding]]:
+        response = await client.generate_async(prompt, vote=vote, text_format=MultiFinding)
+        return _split_verdicts(response, n_truths)
+
+    per_truth: List[List[Finding]] = [[] for _ in range(n_truths)]
+    first_votes = (
+        [await _vote(0)] if iterations <= 1 else list(await asyncio.gather(_vote(0), _vote(1)))
+    )
+    for votes in first_votes:
+        for truth_id, f in enumerate(votes):
+            if f:
+                per_truth[truth_id].append(f)
+
+    if iterations >= 3:
+        need_third = [
+            truth_id
+            for truth_id, responses in enumerate(per_truth)
+            if not (len(responses) == 2 and _agree(responses[0], responses[1]))
+        ]
+        if need_third:
+            third = await _vote(2)
+            for truth_id in need_third:
+                f = third[truth_id]
+                if f:
+                    per_truth[truth_id].append(f)
+    return per_truth
+
+
+def _split_verdicts(response: Optional[MultiFinding], n_truths: int) -> List[Optional[Finding]]:
+    out: List[Optional[Finding]] = [None] * n_truths
+    if response is None:
+        return out
+    for v in response.verdicts:
+        if 0 <= v.truth_id < n_truths and out[v.truth_id] is None:
+            out[v.truth_id] = Finding(**v.model_dump(exclude={"truth_id"}))
+    return out
+
+
+def _apply_index_offset(content: Finding, offset: int) -> None:
     if content.index_of_finding_from_junior_auditor != -1:
-        index_wrt_working = content.index_of_finding_from_junior_auditor + batch_number * batch_size
+        index_wrt_working = content.index_of_finding_from_junior_auditor + offset
         content.index_of_finding_from_junior_auditor = int(index_wrt_working)
 
 
-def _build_prompt(truth_finding: Vulnerability, working_results: List[dict]) -> str:
-    stringified_truth = truth_finding.model_dump_json(indent=2)
-    stringified_results = json.dumps(working_results, indent=2)
-    return (
-        CALCULATE_PROMPT.replace("{truth_finding}", stringified_truth)
-        .replace("{junior_findings}", stringified_results)
-        .strip()
+def apply_index_mapping(content: Finding, positions: List[int]) -> None:
+    """Map an index into a reordered candidate list back to the working-set index."""
+    index = content.index_of_finding_from_junior_auditor
+    if 0 <= index < len(positions):
+        content.index_of_finding_from_junior_auditor = int(positions[index])
+
+
+def build_prompt(truth_json: str, junior_json: str, layout: str = "default") -> str:
+    """The single-truth prompt in `layout`, exactly as it is sent (and cached)."""
+    return _TEMPLATES[layout].render(truth_finding=truth_json, junior_findings=junior_json)
+
+
+def _build_multi_prompt(truth_findings: List[Vulnerability], junior_json: str) -> str:
+    stringified_truths = json.dumps(
+        [
+            {"truth_id": truth_id, **t.model_dump(mode="json")}
+            for truth_id, t in enumerate(truth_findings)
+        ],
+        indent=2,
     )
+    return _MULTI_TEMPLATE.render(junior_findings=junior_json, truth_findings=stringified_truths)
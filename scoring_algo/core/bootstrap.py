@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .types import RepoStats
+
+METRICS = (
+    "precision",
+    "recall",
+    "f1",
+    "precision_with_partial",
+    "recall_with_partial",
+    "f1_with_partial",
+)
+
+Interval = Tuple[float, float]
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    out = np.zeros(np.broadcast_shapes(np.shape(num), np.shape(den)), dtype=np.float64)
+    return np.divide(num, den, out=out, where=den > 0)
+
+
+def _metrics(truth: np.ndarray, scan: np.ndarray) -> Dict[str, np.ndarray]:
+    """Same formulas as `_calc_confusion_metrics`, over arrays of counts.
+
+    `truth[..., :]` holds (matched, partial, missed) truth findings and `scan[..., :]`
+    holds (matched, partial, qa, other) scan findings.
+    """
+    truth = truth.astype(np.float64)
+    scan = scan.astype(np.float64)
+    actual = truth.sum(axis=-1)
+    scan_findings = scan.sum(axis=-1)
+    precision = _ratio(scan[..., 0], scan_findings)
+    recall = _ratio(truth[..., 0], actual)
+    precision_w = _ratio(scan[..., 0] + scan[..., 1], np.maximum(0, scan_findings - scan[..., 2]))
+    recall_w = _ratio(truth[..., 0] + truth[..., 1], actual)
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": _ratio(2 * precision * recall, precision + recall),
+        "precision_with_partial": precision_w,
+        "recall_with_partial": recall_w,
+        "f1_with_partial": _ratio(2 * precision_w * recall_w, precision_w + recall_w),
+    }
+
+
+def _category_counts(stats: Sequence[RepoStats]) -> Tuple[np.ndarray, np.ndarray]:
+    truth = np.array(
+        [[s.matched, s.partial, max(0, s.actual_findings - s.matched - s.partial)] for s in stats],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    scan = np.array(
+        [
+            [
+                s.matched,
+                s.partial,
+                s.qa_findings,
+                max(0, s.scan_findings - s.matched - s.partial - s.qa_findings),
+            ]
+            for s in stats
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    return truth, scan
+
+
+def _resample(counts: np.ndarray, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Multinomial resamples of each row's findings, shape (n_resamples, rows, categories).
+
+    Drawn as a chain of vectorized binomials (each category out of the findings not
+    yet assigned), which is much faster than `Generator.multinomial` with
+    per-row probabilities.
+    """
+    rows, categories = counts.shape
+    totals = counts.sum(axis=1)
+    remaining = np.broadcast_to(totals, (n_resamples, rows)).copy()
+    left = totals.astype(np.float64)
+    out = np.empty((n_resamples, rows, categories), dtype=np.int64)
+    for k in range(categories - 1):
+        p = np.clip(_ratio(counts[:, k].astype(np.float64), left), 0.0, 1.0)
+        if np.all((p == 0.0) | (p == 1.0)):
+            # Nothing random about this category: it takes none or all that is left
+            draw = np.where(p == 1.0, remaining, 0)
+        else:
+            draw = rng.binomial(remaining, p)
+        out[:, :, k] = draw
+        remaining -= draw
+        left -= counts[:, k]
+    out[:, :, -1] = remaining
+    return out
+
+
+def bootstrap_intervals(
+    stats: Sequence[RepoStats],
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Interval]]:
+    """Percentile bootstrap intervals for every metric, per repo and for "ALL".
+
+    Each repo's truth findings (matched / partial / missed) and scan findings
+    (matched / partial / QA / other) are resampled with replacement. The overall row
+    is a two-level bootstrap: the repos are resampled with replacement, then the
+    findings within each drawn repo, so it also covers the repo-to-repo variance.
+    """
+    rng = np.random.default_rng(seed)
+    truth, scan = _category_counts(stats)
+    truth_draws = _resample(truth, n_resamples, rng)
+    scan_draws = _resample(scan, n_resamples, rng)
+
+    # Level one: which repos each overall resample holds. Level two: each drawn repo
+    # takes the within-repo resample of a random replicate; those are i.i.d. draws
+    # for that repo, so no second round of binomials is needed.
+    rows = len(stats)
+    repos = rng.integers(0, rows, size=(n_resamples, rows))
+    replicates = rng.integers(0, n_resamples, size=(n_resamples, rows))
+    overall_truth = truth_draws[replicates, repos].sum(axis=1)
+    overall_scan = scan_draws[replicates, repos].sum(axis=1)
+
+    alpha = (1 - confidence) / 2
+    quantiles = [alpha, 1 - alpha]
+    per_repo = _metrics(truth_draws, scan_draws)
+    overall = _metrics(overall_truth, overall_scan)
+    # One quantile pass over every metric at once: (2, metrics, rows) and (2, metrics)
+    repo_bounds = np.quantile(np.stack([per_repo[m] for m in METRICS]), quantiles, axis=1)
+    all_bounds = np.quantile(np.stack([overall[m] for m in METRICS]), quantiles, axis=1)
+
+    out: Dict[str, Dict[str, Interval]] = {}
+    for i, s in enumerate(stats):
+        out[s.repo] = {
+            m: (float(repo_bounds[0, j, i]), float(repo_bounds[1, j, i]))
+            for j, m in enumerate(METRICS)
+        }
+    out["ALL"] = {
+        m: (float(all_bounds[0, j]), float(all_bounds[1, j])) for j, m in enumerate(METRICS)
+    }
+    return out
+
+
+def interval_columns(intervals: Dict[str, Interval]) -> List[float]:
+    """Flattened (low, high) pairs in `METRICS` order, for tabular outputs."""
+    return [bound for m in METRICS for bound in intervals[m]]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .storage import ensure_dir
+
+
+class CacheMode(str, Enum):
+    OFF = "off"
+    READ = "read"
+    READWRITE = "readwrite"
+    ONLY = "only"
+
+
+class CacheMissError(RuntimeError):
+    """Raised in `only` mode when a prompt has no cached response."""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    def summary(self) -> str:
+        return f"hits={self.hits} misses={self.misses} writes={self.writes}"
+
+
+class VerdictCache:
+    """On-disk store of LLM responses keyed by (model, sha256(prompt), vote index).
+
+    Entries are evicted least-recently-used once `max_entries` is exceeded. The
+    cache only stores serialized responses; callers decide how to parse them.
+
+    Hits do not write to disk: their `last_used` times are buffered and flushed on
+    the next `put`, every `touch_flush_every` hits, and on `close`.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: CacheMode,
+        max_entries: int = 100_000,
+        touch_flush_every: int = 1000,
+    ):
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.touch_flush_every = touch_flush_every
+        self._touched: Dict[Tuple[str, str, int], float] = {}
+        ensure_dir(path.parent)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                model TEXT NOT NULL,
+                prompt_sha TEXT NOT NULL,
+                vote INTEGER NOT NULL,
+                response TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, prompt_sha, vote)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_lru ON verdicts (last_used)")
+        self._conn.commit()
+        self._size: int = self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    @property
+    def readable(self) -> bool:
+        return self.mode in (CacheMode.READ, CacheMode.READWRITE, CacheMode.ONLY)
+
+    @property
+    def writable(self) -> bool:
+        return self.mode == CacheMode.READWRITE
+
+    def get(self, model: str, prompt: str, vote: int) -> Optional[str]:
+        if not self.readable:
+            return None
+        key = (model, _prompt_hash(prompt), vote)
+        row = self._conn.execute(
+            "SELECT response FROM verdicts WHERE model = ? AND prompt_sha = ? AND vote = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.touch_flush_every:
+            self._flush_touched()
+            self._conn.commit()
+        return row[0]
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE verdicts SET last_used = ? WHERE model = ? AND prompt_sha = ? AND vote = ?",
+            [(used, *key) for key, used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def put(self, model: str, prompt: str, vote: int, response: str) -> None:
+        if not self.writable:
+            return
+        key = (model, _prompt_hash(prompt), vote)
+        # Before evicting, so entries hit since the last flush count as recently used
+        self._flush_touched()
+        exists = self._conn.execute(
+            "SELECT 1 FROM verdicts WHERE model = ? AND prompt_sha = ? AND vote = ?", key
+        ).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO verdicts (model, prompt_sha, vote, response, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (*key, response, time.time()),
+        )
+        if exists is None:
+            self._size += 1
+        if self._size > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM verdicts WHERE rowid IN "
+                "(SELECT rowid FROM verdicts ORDER BY last_used ASC LIMIT ?)",
+                (self._size - self.max_entries,),
+            )
+            self._size = self.max_entries
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._flush_touched()
+        self._conn.commit()
+        self._conn.close()
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
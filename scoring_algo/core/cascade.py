@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .types import Finding
+
+if TYPE_CHECKING:
+    from .llm import LLMClient
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@dataclass
+class TierStats:
+    model: str
+    # Prompts this tier voted on, and how many of them it settled
+    screened: int = 0
+    settled: int = 0
+    # Summed wall time of this tier's decisions (its votes run concurrently)
+    decision_s: float = 0.0
+
+    @property
+    def avg_decision_ms(self) -> float:
+        return self.decision_s / self.screened * 1000 if self.screened else 0.0
+
+
+@dataclass
+class CascadeStats:
+    tiers: List[TierStats] = field(default_factory=list)
+    final: Optional[TierStats] = None
+
+
+def _clear_non_match(verdict: Optional[Finding]) -> bool:
+    return verdict is not None and not verdict.is_match and not verdict.is_partial_match
+
+
+class Cascade:
+    """Cheaper models that screen each prompt before the final model votes on it.
+
+    Each tier, cheapest first, casts `votes` concurrent votes. When every vote is a
+    clear non-match (for every truth finding of a multi-truth prompt) the prompt is
+    settled and those votes are the ones counted. Any match, partial or failed vote
+    escalates to the next tier; after the last one, the final model (the `LLMClient`
+    holding this cascade) votes as usual and the tiers' votes are discarded.
+    """
+
+    def __init__(self, tiers: List["LLMClient"], votes: int = 2):
+        self.tiers = tiers
+        self.votes = max(1, votes)
+        self.stats = CascadeStats(tiers=[TierStats(model=t.model) for t in tiers])
+
+    async def screen(
+        self,
+        prompt: str,
+        text_format: Type[M],
+        split: Callable[[Optional[M]], List[Optional[Finding]]],
+    ) -> Optional[List[List[Finding]]]:
+        """The settling tier's votes, each split into per-truth verdicts, or None to escalate."""
+        for tier, stats in zip(self.tiers, self.stats.tiers):
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    tier.generate_async(prompt, vote=vote, text_format=text_format)
+                    for vote in range(self.votes)
+                )
+            )
+            stats.decision_s += time.perf_counter() - started
+            stats.screened += 1
+            votes = [split(r) for r in responses]
+            if all(_clear_non_match(v) for vote in votes for v in vote):
+                stats.settled += 1
+                return votes  # type: ignore[return-value]
+        return None
+
+    def record_final(self, model: str, seconds: float) -> None:
+        if self.stats.final is None:
+            self.stats.final = TierStats(model=model)
+        self.stats.final.screened += 1
+        self.stats.final.decision_s += seconds
+
+    def _cost(self, client: "LLMClient") -> Optional[float]:
+        # From the ledger, which applies the backend's price factor (e.g. Batch API)
+        if client.ledger is None:
+            return None
+        return client.ledger.model_cost(client.model)
+
+    def summary(self, final: "LLMClient") -> str:
+        """Per-tier calls, settled prompts, latency and cost, and the estimated savings.
+
+        The savings price each settled prompt at the final model's average decision
+        time and cost in this run, minus everything the cheaper tiers spent.
+        """
+        parts: List[str] = []
+        tier_s = 0.0
+        tier_cost: Optional[float] = 0.0
+        settled = 0
+        for tier, stats in zip(self.tiers, self.stats.tiers):
+            cost = self._cost(tier)
+            parts.append(
+                f"{tier.model}: calls={tier.stats.calls} settled={stats.settled}/{stats.screened} "
+                f"avg_decision={stats.avg_decision_ms:.0f}ms cost={_money(cost)}"
+            )
+            tier_s += stats.decision_s
+            tier_cost = None if cost is None or tier_cost is None else tier_cost + cost
+            settled += stats.settled
+        final_stats = self.stats.final or TierStats(model=final.model)
+        final_cost = self._cost(final)
+        parts.append(
+            f"{final.model}: calls={final.stats.calls} decided={final_stats.screened} "
+            f"avg_decision={final_stats.avg_decision_ms:.0f}ms cost={_money(final_cost)}"
+        )
+        if final_stats.screened:
+            saved_s = settled * final_stats.decision_s / final_stats.screened - tier_s
+            saved_cost = (
+                None
+                if final_cost is None or tier_cost is None
+                else settled * final_cost / final_stats.screened - tier_cost
+            )
+            parts.append(f"saved~{saved_s:.1f}s of call time, {_money(saved_cost)}")
+        else:
+            parts.append("saved=n/a (nothing escalated to compare with)")
+        return "; ".join(parts)
+
+
+def _money(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"${value:.4f}"
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .types import Vulnerability, WorkingResult
+
+_SOURCE_SUFFIXES = (".sol", ".vy", ".rs", ".move", ".cairo", ".go", ".ts", ".js", ".py")
+
+
+def normalize_contract_path(ref: str) -> str:
+    """Lowercased, forward-slash path with any leading `./` or `/` removed."""
+    path = ref.strip().strip("`'\"").replace("\\", "/").lower()
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+def contract_stem(ref: str) -> str:
+    """`src/PoolV3.sol`, `PoolV3.sol` and `PoolV3` all map to `poolv3`."""
+    name = PurePosixPath(normalize_contract_path(ref)).name
+    # Scan findings sometimes point at `PoolV3.sol:123` or `PoolV3.sol#L10`
+    name = re.split(r"[:#]", name, maxsplit=1)[0]
+    for suffix in _SOURCE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+class ContractResolver:
+    """Resolves the different spellings of a contract to one canonical key.
+
+    Known contracts come from the repo's `contractFiles`; their canonical key is the
+    normalized path from that list. References that match no known contract fall
+    back to their stem so that two findings naming the same unknown file still overlap.
+    """
+
+    def __init__(self, contract_files: Sequence[str]):
+        self._by_path: Dict[str, str] = {}
+        by_stem: Dict[str, List[str]] = defaultdict(list)
+        for ref in contract_files:
+            path = normalize_contract_path(ref)
+            if not path:
+                continue
+            self._by_path[path] = path
+            by_stem[contract_stem(path)].append(path)
+        # Stems shared by several files (e.g. two `Errors.sol`) cannot be resolved from
+        # a bare name; keep them all so the pruning stays conservative
+        self._by_stem: Dict[str, List[str]] = dict(by_stem)
+        stems = sorted((s for s in self._by_stem if len(s) > 2), key=len, reverse=True)
+        # No leading word boundary: scraped reports often lose the space before a
+        # formatted name ("onStrategySupplyBase.undeploy"), and an extra mention only
+        # widens the candidate set
+        self._mention = (
+            re.compile(r"(" + "|".join(re.escape(s) for s in stems) + r")(?:\.\w+)?\b")
+            if stems
+            else None
+        )
+
+    def resolve(self, ref: str) -> List[str]:
+        path = normalize_contract_path(ref)
+        if not path:
+            return []
+        if path in self._by_path:
+            return [path]
+        # `contracts/src/PoolV3.sol` against a `src/PoolV3.sol` entry, or the reverse
+        suffixed = [p for p in self._by_path if p.endswith("/" + path) or path.endswith("/" + p)]
+        if suffixed:
+            return suffixed
+        stem = contract_stem(path)
+        return list(self._by_stem.get(stem, [stem] if stem else []))
+
+    def mentions(self, text: str) -> Set[str]:
+        """Known contracts named anywhere in free text."""
+        if self._mention is None:
+            return set()
+        found: Set[str] = set()
+        for stem in self._mention.findall(text.lower()):
+            found.update(self._by_stem.get(stem, []))
+        return found
+
+    def contracts_of(
+        self, finding: Union[Vulnerability, WorkingResult], scan_text: bool = False
+    ) -> Set[str]:
+        keys: Set[str] = set()
+        for ref in finding.Contracts:
+            keys.update(self.resolve(ref))
+        if not keys and scan_text:
+            keys = self.mentions(f"{finding.Issue}\n{finding.Description}")
+        return keys
+
+
+class ContractIndex:
+    """Inverted index from canonical contract keys to positions in the working set.
+
+    Findings that name no contract at all are always kept as candidates, since there
+    is nothing to rule them out on.
+    """
+
+    def __init__(self, findings: Sequence[WorkingResult], resolver: ContractResolver):
+        self.resolver = resolver
+        self.size = len(findings)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._unscoped: Set[int] = set()
+        for position, finding in enumerate(findings):
+            keys = resolver.contracts_of(finding)
+            if not keys:
+                self._unscoped.add(position)
+            for key in keys:
+                self._postings[key].add(position)
+
+    @classmethod
+    def build(
+        cls, findings: Sequence[WorkingResult], contract_files: Iterable[str]
+    ) -> "ContractIndex":
+        return cls(findings, ContractResolver(list(contract_files)))
+
+    def candidates(self, truth: Vulnerability) -> Optional[List[int]]:
+        """Working-set positions that share a contract with `truth`, in working-set order.
+
+        Returns None when the truth finding names no contract or overlaps no scan
+        finding; callers then fall back to the full working set.
+        """
+        # Truth findings rarely carry a file, so fall back to contracts named in the text
+        keys = self.resolver.contracts_of(truth, scan_text=True)
+        if not keys:
+            return None
+        overlapping: Set[int] = set()
+        for key in keys:
+            overlapping |= self._postings.get(key, set())
+        if not overlapping:
+            return None
+        return sorted(overlapping | self._unscoped)
+
+
+@dataclass
+class PruningStats:
+    truths: int = 0
+    pruned: int = 0
+    fallbacks: int = 0
+    batches_total: int = 0
+    batches_sent: int = 0
+
+    def record(self, batches_total: int, batches_sent: Optional[int]) -> None:
+        self.truths += 1
+        self.batches_total += batches_total
+        if batches_sent is None:
+            self.fallbacks += 1
+            self.batches_sent += batches_total
+        else:
+            self.pruned += 1
+            self.batches_sent += batches_sent
+
+    @property
+    def batches_skipped_share(self) -> float:
+        # A share of batches, not of LLM calls: each batch takes ITERATIONS votes, or
+        # fewer when the first two agree
+        if self.batches_total == 0:
+            return 0.0
+        return 1 - self.batches_sent / self.batches_total
+
+    def summary(self) -> str:
+        return (
+            f"pruned={self.pruned}/{self.truths} fallbacks={self.fallbacks} "
+            f"batches={self.batches_sent}/{self.batches_total} "
+            f"batches_skipped={self.batches_skipped_share:.1%}"
+        )
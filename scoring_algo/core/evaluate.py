@@ -2,23 +2,51 @@ from __future__ import annotations
 
 import asyncio
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Optional, TypeVar
 
-from langfuse import observe
 from rich import print
-from rich.progress import BarColumn, Progress, TimeElapsedColumn, TimeRemainingColumn
 
-from .batching import process_in_batches
+from .backends import LLMBackend
+from .batching import (
+    apply_index_mapping,
+    build_batches,
+    build_token_batches,
+    process_in_batches,
+    process_truths_multi,
+)
+from .cache import VerdictCache
+from .cascade import Cascade
+from .contracts import ContractIndex, PruningStats
+from .incremental import EvaluationState, TruthState, config_hash, fingerprint
+from .journal import EvaluationJournal, file_sha256
+from .ledger import TokenLedger
+from .llm import LLMClient, close_shared_client
+from .metrics import get_metrics
+from .ranking import BM25Index, RankingStats, finding_text
 from .storage import (
     get_evaluation_path,
+    get_journal_path,
+    get_partial_path,
+    get_scan_path,
+    get_state_path,
+    get_truth_path,
+    iter_scan_results,
+    iter_truth_data,
+    read_contract_files,
     read_scan_results,
     read_truth_data,
     store_evaluation_result,
+    store_partial_result,
 )
-from .types import EvaluatedFinding, Finding, WorkingResult
+from .telemetry import observe
+from .types import EvaluatedFinding, Finding, Vulnerability, WorkingResult
+
+if TYPE_CHECKING:
+    from rich.progress import Progress
+
+T = TypeVar("T")
 
 
-@observe(name="[ScoringAlgo] Run scoring algo")
 def run_evaluation(
     repo_name: str,
     data_root: Path,
@@ -28,28 +56,129 @@ def run_evaluation(
     iterations: int,
     batch_size: int,
     debug_prompt: bool,
+    max_concurrency: int = 1,
+    cache: Optional[VerdictCache] = None,
+    batch_mode: str = "count",
+    batch_token_budget: int = 8000,
+    batch_fanout: int = 1,
+    prompt_layout: str = "default",
+    judge_mode: str = "single",
+    multi_truth_token_budget: int = 6000,
+    rank_candidates: bool = False,
+    rank_top_k: int = 20,
+    rank_top_k_only: bool = False,
+    contract_pruning: bool = False,
+    resume: bool = False,
+    incremental: bool = False,
+    backend: Optional[LLMBackend] = None,
+    ledger: Optional[TokenLedger] = None,
+    cascade_models: Optional[List[str]] = None,
+    cascade_votes: int = 2,
 ) -> None:
-    truth = read_truth_data(repo_name, data_root)
-    results = read_scan_results(repo_name, data_root, scan_source)
+    # Run the whole evaluation in one event loop to avoid loop churn
+    asyncio.run(
+        _closing_shared_client(
+            run_evaluation_async(
+                repo_name=repo_name,
+                data_root=data_root,
+                scan_source=scan_source,
+                output_root=output_root,
+                model=model,
+                iterations=iterations,
+                batch_size=batch_size,
+                debug_prompt=debug_prompt,
+                max_concurrency=max_concurrency,
+                cache=cache,
+                batch_mode=batch_mode,
+                batch_token_budget=batch_token_budget,
+                batch_fanout=batch_fanout,
+                prompt_layout=prompt_layout,
+                judge_mode=judge_mode,
+                multi_truth_token_budget=multi_truth_token_budget,
+                rank_candidates=rank_candidates,
+                rank_top_k=rank_top_k,
+                rank_top_k_only=rank_top_k_only,
+                contract_pruning=contract_pruning,
+                resume=resume,
+                incremental=incremental,
+                backend=backend,
+                ledger=ledger,
+                cascade_models=cascade_models,
+                cascade_votes=cascade_votes,
+            )
+        )
+    )
 
-    print(f"[cyan]Loaded[/cyan] truth={len(truth)} findings; junior report={len(results)} findings")
 
-    # working copy with original index mapping
-    working_results: List[WorkingResult] = []
-    for i, r in enumerate(results):
-        working_results.append(
-            WorkingResult(
-                Issue=r.Issue,
-                Category=r.Category,
-                Description=r.Description,
-                Contracts=r.Contracts,
-                Severity=r.Severity,
-                Index=i,
+def run_evaluations(
+    jobs: List[Dict[str, Any]], max_parallel: int
+) -> Dict[str, Optional[Exception]]:
+    """Evaluate several repos in one shared event loop.
+
+    Each job holds the keyword arguments of `run_evaluation`. Jobs are started
+    longest-first (truth count x scan count) so the biggest repo does not end up
+    running alone at the tail, and a failing repo does not abort the others.
+    Returns the error raised by each repo, or None when it succeeded.
+    """
+    return asyncio.run(_closing_shared_client(_run_evaluations_async(jobs, max_parallel)))
+
+
+async def _closing_shared_client(coro: Awaitable[T]) -> T:
+    try:
+        return await coro
+    finally:
+        await close_shared_client()
+
+
+def estimate_repo_cost(repo_name: str, data_root: Path, scan_source: str) -> int:
+    # Only the counts are needed, so stream the files instead of keeping the findings
+    truth = sum(1 for _ in iter_truth_data(repo_name, data_root))
+    results = sum(1 for _ in iter_scan_results(repo_name, data_root, scan_source))
+    return truth * results
+
+
+async def _run_evaluations_async(
+    jobs: List[Dict[str, Any]], max_parallel: int
+) -> Dict[str, Optional[Exception]]:
+    costs: Dict[str, int] = {}
+    for job in jobs:
+        try:
+            costs[job["repo_name"]] = estimate_repo_cost(
+                job["repo_name"], job["data_root"], job["scan_source"]
             )
-        )
+        except Exception:
+            # Let the repo fail (and be reported) when it actually runs
+            costs[job["repo_name"]] = 0
+    ordered = sorted(jobs, key=lambda j: costs[j["repo_name"]], reverse=True)
+    print(
+        "[cyan]Scheduling[/cyan] "
+        + ", ".join(f"{j['repo_name']}={costs[j['repo_name']]}" for j in ordered)
+    )
 
-    evaluated: List[EvaluatedFinding] = []
-    with Progress(
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    errors: Dict[str, Optional[Exception]] = {}
+
+    with _make_progress() as progress:
+
+        async def _run_one(job: Dict[str, Any]) -> None:
+            name = job["repo_name"]
+            async with semaphore:
+                try:
+                    await run_evaluation_async(**job, progress=progress)
+                    errors[name] = None
+                except Exception as e:
+                    errors[name] = e
+                    print(f"[red]Evaluation failed[/red] repo={name}: {e}")
+
+        await asyncio.gather(*(_run_one(job) for job in ordered))
+
+    return {j["repo_name"]: errors.get(j["repo_name"]) for j in jobs}
+
+
+def _make_progress() -> Progress:
+    from rich.progress import BarColumn, Progress, TimeElapsedColumn, TimeRemainingColumn
+
+    return Progress(
         "{task.description}",
         BarColumn(),
         "[progress.percentage]{task.percentage:>3.0f}%",
@@ -57,14 +186,294 @@ def run_evaluation(
         TimeElapsedColumn(),
         "<",
         TimeRemainingColumn(),
-    ) as progress:
+    )
+
+
+@observe(name="[ScoringAlgo] Run scoring algo")
+async def run_evaluation_async(
+    repo_name: str,
+    data_root: Path,
+    scan_source: str,
+    output_root: Path,
+    model: str,
+    iterations: int,
+    batch_size: int,
+    debug_prompt: bool,
+    max_concurrency: int = 1,
+    cache: Optional[VerdictCache] = None,
+    batch_mode: str = "count",
+    batch_token_budget: int = 8000,
+    batch_fanout: int = 1,
+    prompt_layout: str = "default",
+    judge_mode: str = "single",
+    multi_truth_token_budget: int = 6000,
+    rank_candidates: bool = False,
+    rank_top_k: int = 20,
+    rank_top_k_only: bool = False,
+    contract_pruning: bool = False,
+    resume: bool = False,
+    incremental: bool = False,
+    backend: Optional[LLMBackend] = None,
+    ledger: Optional[TokenLedger] = None,
+    cascade_models: Optional[List[str]] = None,
+    cascade_votes: int = 2,
+    progress: Optional[Progress] = None,
+) -> None:
+    """Evaluate one repo inside the running event loop.
+
+    When `progress` is given the repo adds its own row to it, which lets several
+    repos share one live display; otherwise a progress bar is created for the run.
+    With a `ledger`, no new truth finding is dispatched once its budget is spent; the
+    verdicts so far go to `<repo>_results.partial.json` and the journal is kept, so
+    `resume=True` picks up the rest. With `cascade_models`, those models (cheapest
+    first) screen every prompt and only what they do not settle reaches `model`.
+    """
+    truth_sha256 = file_sha256(get_truth_path(repo_name, data_root))
+    scan_sha256 = file_sha256(get_scan_path(repo_name, data_root, scan_source))
+    inputs_sha256 = config_hash({"truth": truth_sha256, "scan": scan_sha256})
+    # Everything that can change a verdict; batch_fanout and concurrency cannot
+    cascade_config = (
+        {"cascade_models": list(cascade_models), "cascade_votes": cascade_votes}
+        if cascade_models
+        else {}
+    )
+    verdict_config = {
+        **cascade_config,
+        "model": model,
+        "iterations": iterations,
+        "batch_size": batch_size,
+        "batch_mode": batch_mode,
+        "batch_token_budget": batch_token_budget,
+        "prompt_layout": prompt_layout,
+        "judge_mode": judge_mode,
+        "multi_truth_token_budget": multi_truth_token_budget,
+        "rank_candidates": rank_candidates,
+        "rank_top_k": rank_top_k,
+        "rank_top_k_only": rank_top_k_only,
+        "contract_pruning": contract_pruning,
+    }
+    config_sha256 = config_hash(verdict_config)
+    state_path = get_state_path(repo_name, output_root)
+    previous: Optional[EvaluationState] = None
+    if incremental:
+        previous = EvaluationState.load(state_path)
+        if previous is not None and previous.config_sha256 != config_sha256:
+            print(f"[yellow]Config changed[/yellow] repo={repo_name}; re-evaluating everything")
+            previous = None
+        if (
+            previous is not None
+            and previous.unchanged(inputs_sha256, config_sha256)
+            and get_evaluation_path(repo_name, output_root).exists()
+        ):
+            print(f"[cyan]Unchanged[/cyan] repo={repo_name}; skipping")
+            return
+
+    metrics = get_metrics()
+    with metrics.timer("load_truth"):
+        truth = read_truth_data(repo_name, data_root)
+    with metrics.timer("load_scan"):
+        results = read_scan_results(repo_name, data_root, scan_source)
+    truth_fps = [fingerprint(t) for t in truth]
+    scan_fps = [fingerprint(r) for r in results]
+    position_of: Dict[str, int] = {}
+    for j, fp in enumerate(scan_fps):
+        position_of.setdefault(fp, j)
+    truth_candidates: Dict[int, List[int]] = {}
+    reused = 0
+
+    print(
+        f"[cyan]Loaded[/cyan] repo={repo_name} truth={len(truth)} findings; "
+        f"junior report={len(results)} findings"
+    )
+
+    # Every final verdict is journaled as soon as it is known, so an interrupted run
+    # can be resumed without paying for the finished truth findings again. Its header
+    # holds the same settings as the config hash, so resuming under any other refuses.
+    journal = EvaluationJournal(
+        get_journal_path(repo_name, output_root),
+        header={
+            "repo": repo_name,
+            **verdict_config,
+            "truth_sha256": truth_sha256,
+            "scan_sha256": scan_sha256,
+        },
+        resume=resume,
+    )
+    if journal.completed:
+        print(
+            f"[cyan]Resumed[/cyan] repo={repo_name} {len(journal.completed)}/{len(truth)} "
+            "truth findings from the journal"
+        )
+
+    # One client per repo: calls share the process-wide connection pool and the
+    # per-repo call timings are reported once the run finishes
+    account = ledger.account(repo_name) if ledger is not None else None
+    cascade: Optional[Cascade] = None
+    if cascade_models:
+        cascade = Cascade(
+            [LLMClient(m, cache=cache, backend=backend, ledger=account) for m in cascade_models],
+            votes=cascade_votes,
+        )
+    client = LLMClient(model, cache=cache, backend=backend, ledger=account, cascade=cascade)
+    # Truth findings left undispatched because the budget ran out, and why
+    unevaluated: List[int] = []
+    stopped: List[str] = []
+
+    def _over_budget() -> bool:
+        reason = account.exhausted() if account is not None else None
+        if reason is not None and not stopped:
+            stopped.append(reason)
+        return reason is not None
+
+    # working copy with original index mapping
+    working_results: List[WorkingResult] = [
+        WorkingResult.from_vulnerability(r, i) for i, r in enumerate(results)
+    ]
+
+    def make_batches(findings: List[WorkingResult]) -> List[List[WorkingResult]]:
+        if batch_mode == "tokens":
+            return build_token_batches(findings, batch_token_budget)
+        return build_batches(findings, batch_size)
+
+    # The working set does not change while truth findings are judged, so unless the
+    # candidates are ranked per truth finding every truth finding sees the same
+    # batches; build them once per repo.
+    batches = make_batches(working_results)
+    if batch_mode == "tokens":
+        print(
+            f"[cyan]Packed[/cyan] repo={repo_name} {len(working_results)} findings into "
+            f"{len(batches)} batches of <= {batch_token_budget} tokens"
+        )
+
+    rank_index: Optional[BM25Index] = None
+    ranking_stats = RankingStats(top_k=rank_top_k, top_k_only=rank_top_k_only)
+    if rank_candidates:
+        if judge_mode == "multi":
+            print("[yellow]Candidate ranking is ignored with JUDGE_MODE=multi[/yellow]")
+        else:
+            rank_index = BM25Index.from_findings(working_results)
+
+    contract_index: Optional[ContractIndex] = None
+    pruning_stats = PruningStats()
+    if contract_pruning:
+        if judge_mode == "multi":
+            print("[yellow]Contract pruning is ignored with JUDGE_MODE=multi[/yellow]")
+        else:
+            contract_index = ContractIndex.build(
+                working_results, read_contract_files(repo_name, data_root)
+            )
+
+    def _reuse(idx: int, candidates: List[int]) -> Optional[Finding]:
+        """The previous run's verdict for truth `idx`, remapped to the current working set."""
+        nonlocal reused
+        if previous is None:
+            return None
+        hit = previous.reuse(truth_fps[idx], {scan_fps[j] for j in candidates})
+        if hit is None:
+            return None
+        verdict, chosen = hit
+        verdict.index_of_finding_from_junior_auditor = (
+            position_of[chosen] if chosen is not None else -1
+        )
+        reused += 1
+        journal.record(idx, verdict)
+        return verdict
+
+    async def _process_all(
+        progress: Progress,
+    ) -> List[tuple[int, Optional[EvaluatedFinding], Optional[Finding]]]:
         task = progress.add_task(f"Evaluating {repo_name} ({len(truth)} issues)", total=len(truth))
 
-        async def _process_all():
-            out: list[tuple[int, Optional[EvaluatedFinding], Optional[Finding]]] = []
-            for idx, finding in enumerate(truth):
+        progress.update(task, advance=len(journal.completed))
+
+        if judge_mode == "multi":
+            everything = list(range(len(working_results)))
+            pending = []
+            for i in range(len(truth)):
+                truth_candidates[i] = everything
+                if journal.get(i) is not None:
+                    continue
+                if _reuse(i, everything) is not None:
+                    progress.update(task, advance=1)
+                    continue
+                pending.append(i)
+
+            done = set()
+
+            def _on_truth_done(i: int, content: Optional[Finding]) -> None:
+                done.add(i)
+                journal.record(pending[i], content)
+                progress.update(task, advance=1)
+
+            contents = await process_truths_multi(
+                truths=[truth[i] for i in pending],
+                all_findings=working_results,
+                repo_name=repo_name,
+                model=model,
+                iterations=iterations,
+                batch_size=batch_size,
+                debug_prompt=debug_prompt,
+                output_root=output_root,
+                client=client,
+                batches=batches,
+                truth_token_budget=multi_truth_token_budget,
+                on_truth_done=_on_truth_done,
+                should_stop=_over_budget if account is not None else None,
+            )
+            unevaluated.extend(idx for i, idx in enumerate(pending) if i not in done)
+            verdicts: Dict[int, Optional[Finding]] = dict(journal.completed)
+            verdicts.update(zip(pending, contents))
+            return [(idx, None, verdicts[idx]) for idx in range(len(truth))]
+
+        # Truth findings are independent of each other until post-processing below,
+        # so they can be judged concurrently. The semaphore bounds how many are in
+        # flight; gather keeps the results in truth order.
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _process_one(
+            idx: int, finding: Vulnerability
+        ) -> tuple[int, Optional[EvaluatedFinding], Optional[Finding]]:
+            # Pruning drops candidates on other contracts and ranking puts the likeliest
+            # first (and, with rank_top_k_only, keeps only those); `positions` maps the
+            # remaining candidates back to the working set
+            positions: Optional[List[int]] = None
+            pruned: Optional[List[int]] = None
+            if contract_index is not None:
+                pruned = positions = contract_index.candidates(finding)
+            if rank_index is not None:
+                order = rank_index.rank(finding_text(finding), within=positions)
+                if rank_top_k_only:
+                    order = order[:rank_top_k]
+                positions = order.tolist()
+            truth_candidates[idx] = (
+                list(range(len(working_results))) if positions is None else sorted(positions)
+            )
+
+            replayed = journal.get(idx)
+            if replayed is not None:
+                return idx, None, replayed
+            previous_verdict = _reuse(idx, truth_candidates[idx])
+            if previous_verdict is not None:
+                progress.update(task, advance=1)
+                return idx, None, previous_verdict
+
+            if contract_index is not None:
+                pruned_batches = (
+                    None
+                    if pruned is None
+                    else len(make_batches([working_results[j] for j in pruned]))
+                )
+                pruning_stats.record(len(batches), pruned_batches)
+            candidates = (
+                working_results if positions is None else [working_results[j] for j in positions]
+            )
+
+            async with semaphore:
+                if _over_budget():
+                    unevaluated.append(idx)
+                    return idx, None, None
                 content = await process_in_batches(
-                    all_findings=working_results,
+                    all_findings=candidates,
                     repo_name=repo_name,
                     truth_finding=finding,
                     model=model,
@@ -72,55 +481,134 @@ def run_evaluation(
                     batch_size=batch_size,
                     debug_prompt=debug_prompt,
                     output_root=output_root,
+                    client=client,
+                    batches=batches if positions is None else make_batches(candidates),
+                    fanout=batch_fanout,
+                    prompt_layout=prompt_layout,
                 )
-                out.append((idx, None, content))
-                progress.update(task, advance=1)
-            return out
-
-        # Run the whole evaluation in one event loop to avoid loop churn
-        results_async = asyncio.run(_process_all())
-        for idx, _, content in results_async:
-
-            if not content:
-                continue
-
-            # Enforce severity from truth (string form)
-            truth_item = truth[idx]
-            truth_severity = getattr(truth_item.Severity, "value", truth_item.Severity)
-            if content.severity_from_truth != truth_severity:
-                content.severity_from_truth = truth_severity
-
-            working_index = content.index_of_finding_from_junior_auditor
-            original_index = -1
-            if 0 <= working_index < len(working_results):
-                original_index = working_results[working_index].Index
-
-            evaluated.append(
-                EvaluatedFinding(
-                    is_match=content.is_match,
-                    is_partial_match=content.is_partial_match,
-                    is_fp=False,
-                    explanation=content.explanation,
-                    severity_from_junior_auditor=content.severity_from_junior_auditor,
-                    severity_from_truth=content.severity_from_truth,
-                    index_of_finding_from_junior_auditor=original_index,
-                    finding_description_from_junior_auditor=(
-                        results[original_index].Description
-                        if 0 <= original_index < len(results)
-                        else "NOT FOUND"
-                    ),
+            if content is not None and positions is not None:
+                rank = content.index_of_finding_from_junior_auditor
+                if rank >= 0 and (content.is_match or content.is_partial_match):
+                    ranking_stats.record(rank)
+                apply_index_mapping(content, positions)
+            journal.record(idx, content)
+            progress.update(task, advance=1)
+            return idx, None, content
+
+        return await asyncio.gather(
+            *(_process_one(idx, finding) for idx, finding in enumerate(truth))
+        )
+
+    try:
+        if progress is None:
+            with _make_progress() as own_progress:
+                results_async = await _process_all(own_progress)
+        else:
+            results_async = await _process_all(progress)
+    finally:
+        journal.close()
+
+    # Saved before post-processing, which removes matched findings from the working set
+    # and so shifts the verdict indices. A run stopped by its budget keeps the last
+    # complete state, so --incremental does not mistake it for a finished run.
+    if not unevaluated:
+        EvaluationState(
+            inputs_sha256=inputs_sha256,
+            config_sha256=config_sha256,
+            scan=scan_fps,
+            truths=[
+                TruthState(
+                    fingerprint=truth_fps[idx],
+                    candidates=truth_candidates.get(idx, []),
+                    verdict=content.model_copy() if content is not None else None,
                 )
-            )
+                for idx, _, content in results_async
+            ],
+        ).save(state_path)
+    if previous is not None:
+        print(f"[cyan]Incremental[/cyan] repo={repo_name} reused={reused}/{len(truth)} verdicts")
+
+    evaluated: List[EvaluatedFinding] = []
+    for idx, _, content in results_async:
+
+        if not content:
+            continue
+
+        # Enforce severity from truth (string form)
+        truth_item = truth[idx]
+        truth_severity = getattr(truth_item.Severity, "value", truth_item.Severity)
+        if content.severity_from_truth != truth_severity:
+            content.severity_from_truth = truth_severity
+
+        working_index = content.index_of_finding_from_junior_auditor
+        original_index = -1
+        if 0 <= working_index < len(working_results):
+            original_index = working_results[working_index].Index
 
-            # remove matched finding from working set to prevent reuse
-            if content.is_match and 0 <= working_index < len(working_results):
-                working_results.pop(working_index)
+        evaluated.append(
+            EvaluatedFinding(
+                is_match=content.is_match,
+                is_partial_match=content.is_partial_match,
+                is_fp=False,
+                explanation=content.explanation,
+                severity_from_junior_auditor=content.severity_from_junior_auditor,
+                severity_from_truth=content.severity_from_truth,
+                index_of_finding_from_junior_auditor=original_index,
+                finding_description_from_junior_auditor=(
+                    results[original_index].Description
+                    if 0 <= original_index < len(results)
+                    else "NOT FOUND"
+                ),
+            )
+        )
 
-            # progress already updated inside _process_all
+        # remove matched finding from working set to prevent reuse
+        if content.is_match and 0 <= working_index < len(working_results):
+            working_results.pop(working_index)
 
     processed = post_process_partial_matches(evaluated)
 
-    # add FPs: all remaining scan items not used by matches/partials
+    if unevaluated:
+        unevaluated.sort()
+        with metrics.timer("store"):
+            partial_path = store_partial_result(
+                processed,
+                repo_name,
+                output_root,
+                stopped=stopped[0],
+                unevaluated=[truth[idx] for idx in unevaluated],
+            )
+        if ledger is not None:
+            ledger.unevaluated[repo_name] = len(unevaluated)
+        print(
+            f"[yellow]Budget reached[/yellow] repo={repo_name} ({stopped[0]}): "
+            f"{len(unevaluated)}/{len(truth)} truth findings not evaluated; partial results in "
+            f"{partial_path}, resume with --resume"
+        )
+    else:
+        _add_false_positives(processed, results)
+        with metrics.timer("store"):
+            store_evaluation_result(processed, repo_name, output_root)
+        journal.discard()
+        get_partial_path(repo_name, output_root).unlink(missing_ok=True)
+        out_path = get_evaluation_path(repo_name, output_root)
+        print(f"[green]Saved results to[/green] {out_path}")
+    print(f"[cyan]LLM timings[/cyan] repo={repo_name} {client.stats.summary()}")
+    print(f"[cyan]LLM scheduler[/cyan] repo={repo_name} {client.scheduler_stats.summary()}")
+    if rank_index is not None:
+        print(f"[cyan]Ranking[/cyan] repo={repo_name} {ranking_stats.summary()}")
+    if contract_index is not None:
+        print(f"[cyan]Contract pruning[/cyan] repo={repo_name} {pruning_stats.summary()}")
+    if cache is not None:
+        print(f"[cyan]LLM cache[/cyan] repo={repo_name} {client.cache_stats.summary()}")
+    if cascade is not None:
+        print(f"[cyan]Cascade[/cyan] repo={repo_name} {cascade.summary(client)}")
+    if account is not None:
+        print(f"[cyan]LLM cost[/cyan] repo={repo_name} {account.usage().summary()}")
+
+
+def _add_false_positives(processed: List[EvaluatedFinding], results: List[Vulnerability]) -> None:
+    """Append every scan finding not used by a match or partial as a false positive."""
     skip_indices = set()
     for r in processed:
         if r.index_of_finding_from_junior_auditor >= 0:
@@ -145,10 +633,6 @@ def run_evaluation(
             )
         )
 
-    store_evaluation_result(processed, repo_name, output_root)
-    out_path = get_evaluation_path(repo_name, output_root)
-    print(f"[green]Saved results to[/green] {out_path}")
-
 
 def post_process_partial_matches(results: List[EvaluatedFinding]) -> List[EvaluatedFinding]:
     true_indices = set()
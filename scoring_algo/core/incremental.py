@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .storage import write_text_atomic
+from .types import Finding, Vulnerability
+
+STATE_VERSION = 1
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def fingerprint(v: Vulnerability) -> str:
+    """Stable id of a finding's content, insensitive to whitespace, case and contract order."""
+    payload = json.dumps(
+        [
+            _normalize(v.Issue),
+            _normalize(v.Description),
+            sorted(_normalize(c) for c in v.Contracts),
+            getattr(v.Severity, "value", v.Severity),
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TruthState:
+    fingerprint: str
+    # Indices into the run's scan fingerprints
+    candidates: List[int]
+    verdict: Optional[Finding]
+
+
+class EvaluationState:
+    """Fingerprints and verdicts of a repo's last run, stored next to its results.
+
+    `reuse` answers whether a truth finding's previous verdict still holds for a new
+    candidate set: the verdict is kept when the candidates are the same or only
+    shrank, as long as the finding it chose is still among them.
+    """
+
+    def __init__(
+        self,
+        inputs_sha256: str,
+        config_sha256: str,
+        scan: List[str],
+        truths: List[TruthState],
+    ):
+        self.inputs_sha256 = inputs_sha256
+        self.config_sha256 = config_sha256
+        self.scan = scan
+        self.truths = truths
+        self._by_fingerprint = {t.fingerprint: t for t in truths}
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["EvaluationState"]:
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if data.get("version") != STATE_VERSION:
+            return None
+        return cls(
+            inputs_sha256=data["inputs_sha256"],
+            config_sha256=data["config_sha256"],
+            scan=data["scan"],
+            truths=[
+                TruthState(
+                    fingerprint=t["fingerprint"],
+                    candidates=t["candidates"],
+                    verdict=(
+                        Finding.model_validate(t["verdict"]) if t["verdict"] is not None else None
+                    ),
+                )
+                for t in data["truths"]
+            ],
+        )
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": STATE_VERSION,
+            "inputs_sha256": self.inputs_sha256,
+            "config_sha256": self.config_sha256,
+            "scan": self.scan,
+            "truths": [
+                {
+                    "fingerprint": t.fingerprint,
+                    "candidates": t.candidates,
+                    "verdict": t.verdict.model_dump(mode="json") if t.verdict is not None else None,
+                }
+                for t in self.truths
+            ],
+        }
+        write_text_atomic(path, json.dumps(payload))
+
+    def unchanged(self, inputs_sha256: str, config_sha256: str) -> bool:
+        return self.inputs_sha256 == inputs_sha256 and self.config_sha256 == config_sha256
+
+    def reuse(
+        self, truth_fingerprint: str, candidates: Set[str]
+    ) -> Optional[Tuple[Finding, Optional[str]]]:
+        """The previous verdict and the fingerprint of the finding it chose, if still valid."""
+        previous = self._by_fingerprint.get(truth_fingerprint)
+        if previous is None or previous.verdict is None:
+            return None
+        if not candidates <= {self.scan[i] for i in previous.candidates}:
+            return None
+        index = previous.verdict.index_of_finding_from_junior_auditor
+        chosen = self.scan[index] if 0 <= index < len(self.scan) else None
+        if chosen is not None and chosen not in candidates:
+            return None
+        return previous.verdict.model_copy(), chosen
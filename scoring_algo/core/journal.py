@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .storage import ensure_dir
+from .types import Finding
+
+JOURNAL_VERSION = 1
+
+
+class JournalConfigError(RuntimeError):
+    """Raised when resuming from a journal written under a different config or inputs."""
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EvaluationJournal:
+    """Append-only JSONL record of the truth-finding verdicts of one repo run.
+
+    The first line is a header with the run config and input hashes; every later
+    line holds one final verdict and is fsynced before `record` returns, so a crash
+    loses at most the verdict being written. Truth findings without a verdict (all
+    calls failed) are not journaled and are dispatched again on resume.
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any], resume: bool = False):
+        self.path = path
+        self.header = {"journal": JOURNAL_VERSION, **header}
+        self.completed: Dict[int, Finding] = {}
+        ensure_dir(path.parent)
+        if resume and path.exists():
+            self._replay()
+            self._fh = path.open("a", encoding="utf-8")
+        else:
+            self._fh = path.open("w", encoding="utf-8")
+            self._append(self.header)
+
+    def _replay(self) -> None:
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        if not lines:
+            raise JournalConfigError(f"Journal {self.path} has no header")
+        recorded = json.loads(lines[0])
+        mismatched = sorted(
+            key
+            for key in set(recorded) | set(self.header)
+            if recorded.get(key) != self.header.get(key)
+        )
+        if mismatched:
+            details = ", ".join(
+                f"{k}: {recorded.get(k)!r} -> {self.header.get(k)!r}" for k in mismatched
+            )
+            raise JournalConfigError(
+                f"Refusing to resume from {self.path}; the run config changed ({details}). "
+                "Run without --resume to start over."
+            )
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves a truncated last line; that verdict is redone
+                continue
+            self.completed[int(entry["truth"])] = Finding.model_validate(entry["verdict"])
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def get(self, truth_index: int) -> Optional[Finding]:
+        return self.completed.get(truth_index)
+
+    def record(self, truth_index: int, verdict: Optional[Finding]) -> None:
+        if verdict is None:
+            return
+        self.completed[truth_index] = verdict
+        self._append({"truth": truth_index, "verdict": verdict.model_dump(mode="json")})
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal once the final results are safely stored."""
+        self.close()
+        self.path.unlink(missing_ok=True)
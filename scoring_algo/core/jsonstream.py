@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence, TextIO, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStream:
+    """Incremental JSON reader over a text file.
+
+    Values are decoded with `JSONDecoder.raw_decode` from a buffer that only holds
+    the unread tail of the file, so memory stays bounded by the chunk size plus the
+    largest single value read.
+    """
+
+    def __init__(self, fh: TextIO, chunk_size: int):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fh.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk  # noqa: E203
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete value: read at least as much again as is pending, so a
+                # value much larger than a chunk is not re-parsed once per chunk
+                if not self._fill(max(self._chunk_size, len(self._buf) - self._pos)):
+                    raise
+                continue
+            # A number or literal that ends the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill(self._chunk_size):
+                continue
+            self._pos = end
+            return obj
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_json_items(
+    path: Path, keys: Sequence[str], chunk_size: int = 1 << 16
+) -> Iterator[Tuple[Optional[str], Any]]:
+    """Yield the items of a top-level JSON array one at a time.
+
+    Accepts either a plain array, yielding `(None, item)`, or an object holding the
+    array under one of `keys`, yielding `(key, item)`; other members of the object
+    are skipped. Raises ValueError for any other layout.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        stream = _JsonStream(fh, chunk_size)
+        first = stream.peek()
+        if first == "[":
+            for item in stream.array():
+                yield None, item
+            return
+        if first != "{":
+            raise ValueError(f"Expected a JSON array or object in {path}")
+
+        stream.expect("{")
+        found = False
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key in keys and stream.peek() == "[":
+                found = True
+                for item in stream.array():
+                    yield key, item
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.expect(",")
+        if not found:
+            raise ValueError(f"Expected an array under one of {list(keys)} in {path}")
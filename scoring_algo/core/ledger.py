@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+
+from rich import print
+
+from .backends import BackendResponse
+from .storage import write_text_atomic
+
+
+@dataclass(frozen=True)
+class Price:
+    """USD per million tokens. Reasoning tokens are part of, and billed as, output tokens."""
+
+    input: float
+    cached_input: float
+    output: float
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, float]) -> "Price":
+        return cls(
+            input=values["input"],
+            cached_input=values.get("cached_input", values["input"]),
+            output=values["output"],
+        )
+
+    def cost(self, input_tokens: int, cached_input_tokens: int, output_tokens: int) -> float:
+        uncached = max(0, input_tokens - cached_input_tokens)
+        return (
+            uncached * self.input
+            + cached_input_tokens * self.cached_input
+            + output_tokens * self.output
+        ) / 1_000_000
+
+
+@dataclass
+class Usage:
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, response: BackendResponse, cost_usd: float) -> None:
+        self.calls += 1
+        self.input_tokens += response.input_tokens
+        self.cached_input_tokens += response.cached_input_tokens
+        self.output_tokens += response.output_tokens
+        self.reasoning_tokens += response.reasoning_tokens
+        self.cost_usd += cost_usd
+
+    def summary(self) -> str:
+        return (
+            f"calls={self.calls} input={self.input_tokens} "
+            f"(cached={self.cached_input_tokens}) output={self.output_tokens} "
+            f"(reasoning={self.reasoning_tokens}) cost=${self.cost_usd:.4f}"
+        )
+
+
+@dataclass
+class Budget:
+    """Caps on billed tokens (input + output) and on cost; 0 means no cap."""
+
+    max_cost: float = 0.0
+    max_tokens: int = 0
+
+    def exceeded_by(self, usage: Usage) -> Optional[str]:
+        if self.max_cost and usage.cost_usd >= self.max_cost:
+            return f"cost ${usage.cost_usd:.4f} >= ${self.max_cost:.4f}"
+        if self.max_tokens and usage.tokens >= self.max_tokens:
+            return f"tokens {usage.tokens} >= {self.max_tokens}"
+        return None
+
+
+@dataclass
+class TokenLedger:
+    """Tokens and cost of every LLM call of a run, per repo and model, under budget caps.
+
+    Calls answered from the verdict cache cost nothing and are not recorded. The caps
+    are checked before a truth finding is dispatched, so the calls already in flight
+    finish and a run can end slightly above them.
+    """
+
+    prices: Dict[str, Price] = field(default_factory=dict)
+    run_budget: Budget = field(default_factory=Budget)
+    repo_budget: Budget = field(default_factory=Budget)
+    total: Usage = field(default_factory=Usage)
+    by_repo_model: Dict[Tuple[str, str], Usage] = field(default_factory=dict)
+    unevaluated: Dict[str, int] = field(default_factory=dict)
+    _unpriced: Set[str] = field(default_factory=set, repr=False)
+
+    @classmethod
+    def from_settings(
+        cls,
+        model_prices: Mapping[str, Mapping[str, float]],
+        run_budget: Budget,
+        repo_budget: Budget,
+    ) -> "TokenLedger":
+        return cls(
+            prices={model: Price.from_dict(p) for model, p in model_prices.items()},
+            run_budget=run_budget,
+            repo_budget=repo_budget,
+        )
+
+    def record(
+        self, repo: str, model: str, response: BackendResponse, price_factor: float = 1.0
+    ) -> None:
+        price = self.prices.get(model)
+        if price is None:
+            if model not in self._unpriced:
+                self._unpriced.add(model)
+                print(f"[yellow]No price for model {model}; its calls count as $0[/yellow]")
+            cost = 0.0
+        else:
+            cost = price_factor * price.cost(
+                response.input_tokens, response.cached_input_tokens, response.output_tokens
+            )
+        self.total.add(response, cost)
+        key = (repo, model)
+        if key not in self.by_repo_model:
+            self.by_repo_model[key] = Usage()
+        self.by_repo_model[key].add(response, cost)
+
+    def repo_usage(self, repo: str) -> Usage:
+        usage = Usage()
+        for (name, _), u in self.by_repo_model.items():
+            if name != repo:
+                continue
+            for key, value in asdict(u).items():
+                setattr(usage, key, getattr(usage, key) + value)
+        return usage
+
+    def exhausted(self, repo: str) -> Optional[str]:
+        """Why no new work may be dispatched for `repo`, or None while under budget."""
+        reason = self.run_budget.exceeded_by(self.total)
+        if reason is not None:
+            return f"run {reason}"
+        reason = self.repo_budget.exceeded_by(self.repo_usage(repo))
+        if reason is not None:
+            return f"repo {reason}"
+        return None
+
+    def account(self, repo: str) -> "LedgerAccount":
+        return LedgerAccount(self, repo)
+
+    def to_dict(self) -> Dict[str, Any]:
+        repos: Dict[str, Dict[str, Any]] = {}
+        for (repo, model), usage in sorted(self.by_repo_model.items()):
+            repos.setdefault(repo, {})[model] = asdict(usage)
+        return {
+            "budget": {"run": asdict(self.run_budget), "repo": asdict(self.repo_budget)},
+            "total": asdict(self.total),
+            "repos": repos,
+            "unevaluated": dict(self.unevaluated),
+        }
+
+    def write(self, path: Path) -> None:
+        write_text_atomic(path, json.dumps(self.to_dict(), indent=2))
+
+
+@dataclass
+class LedgerAccount:
+    """One repo's view of the ledger, handed to its `LLMClient`."""
+
+    ledger: TokenLedger
+    repo: str
+
+    def record(self, model: str, response: BackendResponse, price_factor: float = 1.0) -> None:
+        self.ledger.record(self.repo, model, response, price_factor)
+
+    def exhausted(self) -> Optional[str]:
+        return self.ledger.exhausted(self.repo)
+
+    def usage(self) -> Usage:
+        return self.ledger.repo_usage(self.repo)
+
+    def model_cost(self, model: str) -> Optional[float]:
+        """What this repo's calls to `model` cost, or None when the model has no price."""
+        if model not in self.ledger.prices:
+            return None
+        usage = self.ledger.by_repo_model.get((self.repo, model))
+        return usage.cost_usd if usage is not None else 0.0
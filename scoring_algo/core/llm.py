@@ -1,74 +1,388 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from typing import Optional
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Type, TypeVar
 
-import tiktoken
-from langfuse.openai import AsyncOpenAI
-from langfuse.types import List
+from pydantic import BaseModel
 
-from ..settings import Settings
-from .telemetry import observe, update_generation
+from ..settings import get_settings
+from .backends import BackendResponse, LLMBackend, LocalBackend
+from .cache import CacheMissError, CacheMode, CacheStats, VerdictCache
+from .ledger import LedgerAccount
+from .metrics import get_metrics
+from .scheduler import SchedulerStats, _is_retryable, get_scheduler
+from .telemetry import Generation, generation
 from .types import Finding
 
+if TYPE_CHECKING:
+    # openai, langfuse, httpx and tiktoken are imported where they are first used, so
+    # importing this module (e.g. for `scoring-algo --help`) does not load them
+    import httpx
+    import tiktoken
+    from langfuse.openai import AsyncOpenAI
 
-class LLMClient:
-    def __init__(self, model: str):
-        self.model = model
-        self._api_key: Optional[str] = None
+    from .cascade import Cascade
 
-        if not self.is_model_supported(model):
-            raise ValueError(f"Unsupported model {model}")
+M = TypeVar("M", bound=BaseModel)
+
+
+class PromptTooLongError(RuntimeError):
+    """The rendered prompt does not fit in the model's context window."""
+
+
+@dataclass
+class CallTiming:
+    """Wall-clock split of one LLM call, filled in from httpcore trace events."""
+
+    connect_s: float = 0.0
+    server_wait_s: float = 0.0
+    total_s: float = 0.0
+    new_connections: int = 0
+    # perf_counter() when the response headers arrived; the rest is body read and parsing
+    headers_at: float = 0.0
+
+
+@dataclass
+class LLMCallStats:
+    calls: int = 0
+    new_connections: int = 0
+    connect_s: float = 0.0
+    server_wait_s: float = 0.0
+    total_s: float = 0.0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+
+    def record(self, timing: CallTiming) -> None:
+        self.calls += 1
+        self.new_connections += timing.new_connections
+        self.connect_s += timing.connect_s
+        self.server_wait_s += timing.server_wait_s
+        self.total_s += timing.total_s
+
+    def record_usage(self, response: BackendResponse) -> None:
+        self.input_tokens += response.input_tokens
+        self.cached_input_tokens += response.cached_input_tokens
+        self.output_tokens += response.output_tokens
+        self.reasoning_tokens += response.reasoning_tokens
+
+    def summary(self) -> str:
+        n = max(1, self.calls)
+        return (
+            f"calls={self.calls} new_connections={self.new_connections} "
+            f"avg_connect={self.connect_s / n * 1000:.0f}ms "
+            f"avg_server_wait={self.server_wait_s / n * 1000:.0f}ms "
+            f"avg_total={self.total_s / n * 1000:.0f}ms "
+            f"cached_input={self.cached_input_tokens}/{self.input_tokens} tokens "
+            f"output={self.output_tokens} (reasoning={self.reasoning_tokens}) tokens"
+        )
+
+
+_current_timing: ContextVar[Optional[CallTiming]] = ContextVar("_current_timing", default=None)
+
+# Wall time of every LLM request made in this process, while a benchmark collects them
+_call_durations: Optional[list[float]] = None
+
+
+def collect_call_durations() -> list[float]:
+    """Start recording the total time of every LLM request and return the list it goes to."""
+    global _call_durations
+    _call_durations = []
+    return _call_durations
 
+
+# One AsyncOpenAI (and therefore one HTTP connection pool) per event loop
+_shared_client: Optional[AsyncOpenAI] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_shared_client(api_key: str) -> AsyncOpenAI:
+    """Return the process-wide client, creating it on first use in the running loop.
+
+    Connections are bound to the event loop that opened them, so a client created
+    under a previous `asyncio.run` is not reused.
+    """
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client_loop is not loop:
+        import httpx
+        from langfuse.openai import AsyncOpenAI
+        from openai import DefaultAsyncHttpxClient
+
+        cfg = get_settings()
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=cfg.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=cfg.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(cfg.LLM_TIMEOUT, connect=cfg.LLM_CONNECT_TIMEOUT),
+            event_hooks={"request": [_attach_trace]},
+        )
+        # Retries are owned by the request scheduler
+        _shared_client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client, _shared_client_loop
+    client, _shared_client, _shared_client_loop = _shared_client, None, None
+    if client is not None:
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+
+async def _attach_trace(request: httpx.Request) -> None:
+    timing = _current_timing.get()
+    if timing is None:
+        return
+    started: dict[str, float] = {}
+
+    async def trace(event_name: str, info: dict[str, Any]) -> None:
+        # e.g. "connection.connect_tcp.started", "http11.receive_response_headers.complete"
+        step, _, phase = event_name.rpartition(".")
+        if phase == "started":
+            started[step] = time.perf_counter()
+            return
+        elapsed = time.perf_counter() - started.pop(step, time.perf_counter())
+        if step == "connection.connect_tcp":
+            timing.new_connections += 1
+            timing.connect_s += elapsed
+        elif step == "connection.start_tls":
+            timing.connect_s += elapsed
+        elif step.endswith(".receive_response_headers"):
+            timing.server_wait_s += elapsed
+            timing.headers_at = time.perf_counter()
+
+    request.extensions["trace"] = trace
+
+
+class OpenAIBackend:
+    """The OpenAI Responses API, through the shared (Langfuse-wrapped) client."""
+
+    def __init__(self, api_key: Optional[str]):
+        self._api_key = api_key
+
+    async def parse(self, model: str, prompt: str, text_format: Type[M]) -> BackendResponse:
+        client = get_shared_client(self._api_key or "")
+        response = await client.responses.parse(
+            model=model,
+            input=_responses_input_from_text(prompt),
+            text_format=text_format,
+        )
+        # Provider-reported prompt usage, including tokens served from the prefix cache
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "input_tokens_details", None)
+        output_details = getattr(usage, "output_tokens_details", None)
+        timing = _current_timing.get()
+        return BackendResponse(
+            parsed=getattr(response, "output_parsed", None),
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            cached_input_tokens=getattr(details, "cached_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            reasoning_tokens=getattr(output_details, "reasoning_tokens", 0) or 0,
+            parse_s=(
+                time.perf_counter() - timing.headers_at if timing and timing.headers_at else 0.0
+            ),
+        )
+
+
+def provider_of(model: str) -> Optional[str]:
+    """The `SUPPORTED_MODELS` provider serving `model`, if any."""
+    cfg = get_settings()
+    for provider, models in cfg.SUPPORTED_MODELS.items():
+        if model in models:
+            return provider
+    return None
+
+
+def _package_path(path: str) -> Path:
+    # Relative paths in settings are relative to the package, like DATA_ROOT
+    p = Path(path)
+    return p if p.is_absolute() else Path(__file__).resolve().parent.parent / p
+
+
+def make_backend(provider: str, cache: Optional[VerdictCache] = None) -> LLMBackend:
+    cfg = get_settings()
+    if provider == "local":
+        return LocalBackend(
+            fixture=_package_path(cfg.LOCAL_FIXTURE) if cfg.LOCAL_FIXTURE else None,
+            latency_ms=cfg.LOCAL_LATENCY_MS,
+            jitter_ms=cfg.LOCAL_LATENCY_JITTER_MS,
+            match_threshold=cfg.LOCAL_MATCH_THRESHOLD,
+            partial_threshold=cfg.LOCAL_PARTIAL_THRESHOLD,
+        )
+    if provider == "openai":
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and not (cache is not None and cache.mode == CacheMode.ONLY):
             raise RuntimeError("OPENAI_API_KEY is not set")
-        self._api_key = api_key
+        return OpenAIBackend(api_key)
+    raise ValueError(f"Unsupported provider {provider}")
+
+
+class LLMClient:
+    def __init__(
+        self,
+        model: str,
+        cache: Optional[VerdictCache] = None,
+        backend: Optional[LLMBackend] = None,
+        ledger: Optional[LedgerAccount] = None,
+        cascade: Optional["Cascade"] = None,
+    ):
+        self.model = model
+        self.cache = cache
+        self.ledger = ledger
+        # Cheaper models that screen each prompt before this one votes on it
+        self.cascade = cascade
+        self.stats = LLMCallStats()
+        self.cache_stats = CacheStats()
+        self.scheduler_stats = SchedulerStats()
+
+        provider = provider_of(model)
+        if provider is None:
+            raise ValueError(f"Unsupported model {model}")
+        self.provider = provider
+        self.backend = backend if backend is not None else make_backend(provider, cache)
 
     @classmethod
     def is_model_supported(cls, model: str) -> bool:
         """Check if a model is supported by any provider."""
-        cfg = Settings()
-        for models in cfg.SUPPORTED_MODELS.values():
-            if model in models:
-                return True
-        return False
+        return provider_of(model) is not None
+
+    async def generate_async(
+        self, prompt: str, vote: int = 0, text_format: Type[M] = Finding  # type: ignore[assignment]
+    ) -> Optional[M]:
+        """Return the verdict for `prompt`, served from the verdict cache when possible.
+
+        `vote` is the slot of this call among the repeated votes on the same prompt,
+        so each vote gets its own cache entry. `text_format` is the structured-output
+        model the response is parsed into.
+        """
+        if self.cache is not None and self.cache.readable:
+            cached = self.cache.get(self.model, prompt, vote)
+            if cached is not None:
+                self.cache_stats.hits += 1
+                with get_metrics().timer("response_parse"):
+                    return text_format.model_validate_json(cached)
+            self.cache_stats.misses += 1
+            if self.cache.mode == CacheMode.ONLY:
+                raise CacheMissError(f"No cached response for model={self.model} vote={vote}")
 
-    @observe(name="[LLM] Send prompt to LLM (async)", as_type="generation")
-    async def generate_async(self, prompt: str) -> Optional[Finding]:
+        parsed_response = await self._generate_uncached(prompt, text_format)
+        if parsed_response is not None and self.cache is not None and self.cache.writable:
+            self.cache.put(self.model, prompt, vote, parsed_response.model_dump_json())
+            self.cache_stats.writes += 1
+        return parsed_response
+
+    async def _generate_uncached(self, prompt: str, text_format: Type[M]) -> Optional[M]:
+        with generation("[LLM] Send prompt to LLM (async)", model=self.model) as gen:
+            return await self._generate_traced(gen, prompt, text_format)
+
+    async def _generate_traced(
+        self, gen: Generation, prompt: str, text_format: Type[M]
+    ) -> Optional[M]:
+        scheduled = getattr(self.backend, "scheduled", True)
         try:
-            messages = _responses_input_from_text(prompt)
-            client = AsyncOpenAI(api_key=self._api_key)
-            try:
-                response = await client.responses.parse(
-                    model=self.model,
-                    input=messages,
-                    text_format=Finding,
-                )
-            finally:
+            timings: list[CallTiming] = []
+
+            async def _request() -> BackendResponse:
+                timing = CallTiming()
+                token = _current_timing.set(timing)
+                metrics = get_metrics()
+                metrics.counter("llm_calls_total").inc()
+                started = time.perf_counter()
+                parse_s = 0.0
                 try:
-                    await client.close()
-                except Exception:
-                    pass
-
-            parsed_response: Optional[Finding] = getattr(response, "output_parsed", None)
-            input_text = _openai_messages_langfuse(messages)
-            output_text = str(parsed_response)
-            update_generation(
-                model=self.model,
-                usage_details={
-                    "input": count_tokens(input_text),
-                    "output": count_tokens(output_text),
-                },
-                input=input_text,
-                output=output_text,
-            )
-            return parsed_response
+                    response = await self.backend.parse(self.model, prompt, text_format)
+                    parse_s = response.parse_s
+                    return response
+                finally:
+                    timing.total_s = time.perf_counter() - started
+                    metrics.observe("llm_wait", timing.total_s - parse_s)
+                    if parse_s:
+                        metrics.observe("response_parse", parse_s)
+                    _current_timing.reset(token)
+                    self.stats.record(timing)
+                    timings.append(timing)
+                    if _call_durations is not None:
+                        _call_durations.append(timing.total_s)
+
+            if scheduled:
+                # Retries, rate limits and concurrency are handled by the shared scheduler;
+                # the token estimate (~4 characters per token) only feeds the TPM bucket.
+                response = await get_scheduler().run(
+                    _request, tokens=len(prompt) // 4, stats=self.scheduler_stats
+                )
+            else:
+                response = await _request()
+            timing = timings[-1]
+            self.stats.record_usage(response)
+            if self.ledger is not None:
+                self.ledger.record(self.model, response, getattr(self.backend, "price_factor", 1.0))
+            gen.set_payload(lambda: self._generation_payload(prompt, response, timing))
+            return response.parsed  # type: ignore[return-value]
         except Exception as e:
-            print(f"[LLMPrompt] OpenAI API error (async) for {self.model}: {e}")
+            if isinstance(e, PromptTooLongError):
+                raise
+            if _is_context_length_error(e):
+                raise PromptTooLongError(str(e)) from e
+            if not (scheduled and _is_retryable(e)):
+                # The scheduler already counted the retryable ones as dropped
+                self.scheduler_stats.failed += 1
+            message = str(e)
+            print(f"[LLMPrompt] {self.provider} API error (async) for {self.model}: {message}")
+            gen.set_payload(lambda: {"level": "ERROR", "status_message": message})
             return None
 
+    def _generation_payload(
+        self, prompt: str, response: BackendResponse, timing: CallTiming
+    ) -> dict[str, Any]:
+        """Langfuse fields of a finished call; runs on the telemetry exporter thread.
+
+        Token counts come from the provider's usage block; the prompt and output are
+        only tokenized locally when a backend reports no usage.
+        """
+        input_text = _openai_messages_langfuse(_responses_input_from_text(prompt))
+        output_text = str(response.parsed)
+        return {
+            "usage_details": {
+                "input": response.input_tokens or count_tokens(input_text, self.model),
+                "output": response.output_tokens or count_tokens(output_text, self.model),
+                "input_cached_tokens": response.cached_input_tokens,
+                "output_reasoning_tokens": response.reasoning_tokens,
+            },
+            "input": input_text,
+            "output": output_text,
+            "metadata": {
+                "connect_ms": round(timing.connect_s * 1000, 1),
+                "server_wait_ms": round(timing.server_wait_s * 1000, 1),
+            },
+        }
+
+
+def _is_context_length_error(e: Exception) -> bool:
+    from openai import BadRequestError
+
+    if not isinstance(e, BadRequestError):
+        return False
+    code = getattr(e, "code", None) or ""
+    message = str(e).lower()
+    return (
+        code == "context_length_exceeded"
+        or "context length" in message
+        or "maximum context" in message
+    )
+
 
 def _responses_input_from_text(text: str) -> list[dict]:
     return [
@@ -79,12 +393,27 @@ def _responses_input_from_text(text: str) -> list[dict]:
     ]
 
 
-def count_tokens(text: str) -> int:
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]) -> tiktoken.Encoding:
+    import tiktoken
+
+    if model is None:
+        return tiktoken.get_encoding("cl100k_base")
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Models tiktoken does not know yet (dated gpt-5 snapshots, "local") use o200k
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
     """
     Count the number of tokens in a text using the configured encoding.
 
     Args:
         text: The text to count tokens for.
+        model: Count with this model's encoding; by default cl100k_base, which the
+            batch token budgets are calibrated against.
 
     Returns:
         int: The number of tokens in the text.
@@ -93,8 +422,7 @@ def count_tokens(text: str) -> int:
         ValidationError: If the text is not a string or if there's an encoding error.
     """
 
-    enc = tiktoken.get_encoding("cl100k_base")
-    tokens = enc.encode(text)
+    tokens = _encoding(model).encode(text)
     return len(tokens)
 
 
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .storage import ensure_dir, write_text_atomic
+
+PREFIX = "scoring"
+
+# Seconds; wide enough for a sub-millisecond prompt build and a multi-minute LLM call
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)  # fmt: skip
+
+# Pipeline stages timed by `timer` / `observe`, in the order they are reported
+STAGES = (
+    "load_truth",
+    "load_scan",
+    "prompt_build",
+    "llm_wait",
+    "response_parse",
+    "vote",
+    "store",
+)
+
+
+class Histogram:
+    """Prometheus-style histogram: cumulative bucket counts, sum and count."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate, interpolating linearly inside the bucket (as `histogram_quantile`)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if n and seen + n >= rank:
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+            lower = upper
+        return self.max
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.max = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+        if value > self.max:
+            self.max = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.set(self.value + amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.set(self.value - amount)
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+_HELP = {
+    "stage_seconds": "Wall time of each pipeline stage",
+    "llm_in_flight": "LLM requests currently sent and not yet answered",
+    "llm_queue_depth": "LLM requests waiting for an in-flight slot",
+    "batch_pending": "LLM calls waiting for the next Batch API round",
+    "llm_calls_total": "LLM requests sent, retries included",
+}
+
+
+class MetricsRegistry:
+    """Process-wide timers, gauges and counters for one evaluation run.
+
+    Everything is updated from the event loop thread; the exporters only read, so
+    a scrape may see a stage a few observations behind.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.stages: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.counters: Dict[str, Counter] = {}
+
+    def reset(self) -> None:
+        self.__init__()  # type: ignore[misc]
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def gauge(self, name: str) -> Gauge:
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            gauge = self.gauges[name] = Gauge()
+        return gauge
+
+    def counter(self, name: str) -> Counter:
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = Counter()
+        return counter
+
+    def _ordered_stages(self) -> List[str]:
+        known = [s for s in STAGES if s in self.stages]
+        return known + sorted(s for s in list(self.stages) if s not in STAGES)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        name = f"{PREFIX}_stage_seconds"
+        lines.append(f"# HELP {name} {_HELP['stage_seconds']}")
+        lines.append(f"# TYPE {name} histogram")
+        for stage in self._ordered_stages():
+            h = self.stages[stage]
+            cumulative = 0
+            for bound, n in zip(h.buckets, h.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        series: List[Tuple[str, Mapping[str, Union[Gauge, Counter]]]] = [
+            ("gauge", self.gauges),
+            ("counter", self.counters),
+        ]
+        for kind, metrics in series:
+            for key, metric in sorted(list(metrics.items())):
+                full = f"{PREFIX}_{key}"
+                if key in _HELP:
+                    lines.append(f"# HELP {full} {_HELP[key]}")
+                lines.append(f"# TYPE {full} {kind}")
+                lines.append(f"{full} {metric.value:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        wall_s = time.monotonic() - self.started
+        calls = self.counters.get("llm_calls_total")
+        return {
+            "wall_s": round(wall_s, 3),
+            "llm_calls_per_s": round(calls.value / wall_s, 3) if calls and wall_s > 0 else 0.0,
+            "stages": {
+                stage: {
+                    "count": h.count,
+                    "total_s": round(h.sum, 3),
+                    "mean_ms": round(h.sum / h.count * 1000, 3) if h.count else 0.0,
+                    "p50_ms": round(h.quantile(0.50) * 1000, 3),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 3),
+                    "p99_ms": round(h.quantile(0.99) * 1000, 3),
+                    "max_ms": round(h.max * 1000, 3),
+                }
+                for stage, h in ((s, self.stages[s]) for s in self._ordered_stages())
+            },
+            "gauges": {k: {"value": g.value, "max": g.max} for k, g in sorted(self.gauges.items())},
+            "counters": {k: c.value for k, c in sorted(self.counters.items())},
+        }
+
+    def summary_line(self) -> str:
+        parts = [
+            f"{stage}={h.sum:.2f}s/p95={h.quantile(0.95) * 1000:.1f}ms"
+            for stage, h in ((s, self.stages[s]) for s in self._ordered_stages())
+        ]
+        return " ".join(parts)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _registry
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve `GET /metrics` from a daemon thread; call `shutdown()` on the result to stop."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class PrometheusFileExporter:
+    """Rewrites a Prometheus text file every `interval` seconds, e.g. for a textfile collector."""
+
+    def __init__(self, path: Path, interval: float = 15.0):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "PrometheusFileExporter":
+        ensure_dir(self.path.parent)
+        self._thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        write_text_atomic(self.path, get_metrics().render_prometheus())
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
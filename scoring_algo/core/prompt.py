@@ -1,15 +1,22 @@
 # flake8: noqa E501
-CALCULATE_PROMPT = """Formatting re-enabled.
+# The layouts below are assembled from shared sections so their wording cannot drift
+# apart. The verdict cache keys on the exact prompt text: any change here invalidates it.
+
+_ROLE = """Formatting re-enabled.
 You are a **smart contracts security expert** tasked with evaluating the accuracy of a junior auditor's security report.
 
-## **Context:**
+"""
+
+_CONTEXT = """## **Context:**
 You are provided with two pieces of information found in the same source code:
 1. **A verified security issue** identified by a senior auditor (this serves as the **ground truth**).
 2. **A serie of findings** produced by a junior auditor.
 
 Your task is to determine whether the **junior auditor successfully identified the verified security issue** in his report.
 
-## **Evaluation Criteria:**
+"""
+
+_MATCH_CRITERIA = """## **Evaluation Criteria:**
 A junior auditor's finding **is a valid match** **only if** it:
 - **Correctly identifies the contract** where the issue exists.
 - **Correctly identifies the function** where the issue occurs.
@@ -27,35 +34,130 @@ A partial match is **not** a valid match, but **should allow a competent auditor
 - It **only mentions the correct function** without explaining the issue and its consequences.
 - The description is **too vague or inaccurate** to understand the problem and how to fix it. Consider a partial match in that case.
 
-If multiple matches are found, select the one with the **closest description** to the ground truth finding.
+"""
 
-## **Output Format:**
-Return a **JSON object** with the **exact structure** below **(no additional text, reasoning, or chain-of-thought)**:
-```json
-{
-    "is_match": True,
+_CLOSEST_MATCH = """If multiple matches are found, select the one with the **closest description** to the ground truth finding.
+
+"""
+
+_VERDICT_FIELDS = """    "is_match": True,
     "is_partial_match": False,
     "explanation": "The finding is a match for the verified issue because...",
     "severity_from_junior_auditor": "High",
     "severity_from_truth": "Medium",
     "index_of_finding_from_junior_auditor": 2,
-}
+"""
+
+_OUTPUT_FORMAT = (
+    """## **Output Format:**
+Return a **JSON object** with the **exact structure** below **(no additional text, reasoning, or chain-of-thought)**:
+```json
+{
+"""
+    + _VERDICT_FIELDS
+    + """}
 ```
 
-## **Important considerations:**
-- Return the index (0-based) of the finding in the junior auditor's report array that matches or partially matches the verified issue.
+"""
+)
+
+_CONSIDERATIONS_HEADER = """## **Important considerations:**
+"""
+
+_CONSIDERATIONS = """- Return the index (0-based) of the finding in the junior auditor's report array that matches or partially matches the verified issue.
 - If no match is found, set "index_of_finding_from_junior_auditor" to -1.
 - Use "N/A" for any missing severity.
 - Think step by step and carefully evaluate the match before producing the final JSON output.
 - You have to check each and every findings from the junior auditor before making any conclusions
 
-## **Verified security issue:**
+"""
+
+_TRUTH_FINDING = """## **Verified security issue:**
 ```json
 {truth_finding}
  ```
+"""
 
-## **Entire report of findings from the junior auditor:**
+_JUNIOR_FINDINGS = """## **Entire report of findings from the junior auditor:**
 ```json
 {junior_findings}
 ```
 """
+
+_INSTRUCTIONS = (
+    _ROLE
+    + _CONTEXT
+    + _MATCH_CRITERIA
+    + _CLOSEST_MATCH
+    + _OUTPUT_FORMAT
+    + _CONSIDERATIONS_HEADER
+    + _CONSIDERATIONS
+)
+
+CALCULATE_PROMPT = _INSTRUCTIONS + _TRUTH_FINDING + "\n" + _JUNIOR_FINDINGS
+
+# Same instructions with the junior findings before the verified issue. Every truth
+# finding judged against the same batch then shares the prompt up to the batch JSON,
+# which lets provider-side prompt-prefix caching apply.
+CALCULATE_PROMPT_PREFIX_CACHED = _INSTRUCTIONS + _JUNIOR_FINDINGS + "\n" + _TRUTH_FINDING
+
+# Judges several verified issues against one batch in a single call. The findings come
+# first so that calls for the same batch share their prefix.
+_MULTI_CONTEXT = """## **Context:**
+You are provided with two pieces of information found in the same source code:
+1. **A serie of findings** produced by a junior auditor.
+2. **A list of verified security issues** identified by a senior auditor (these serve as the **ground truth**). Each verified issue has a `truth_id`.
+
+Your task is to determine, **independently for each verified security issue**, whether the **junior auditor successfully identified it** in his report.
+
+"""
+
+_MULTI_CLOSEST_MATCH = """If multiple matches are found for a verified issue, select the one with the **closest description** to that verified issue.
+
+"""
+
+_MULTI_OUTPUT_FORMAT = (
+    """## **Output Format:**
+Return a **JSON object** with the **exact structure** below, with **one verdict per verified issue** **(no additional text, reasoning, or chain-of-thought)**:
+```json
+{
+    "verdicts": [
+        {
+            "truth_id": 0,
+"""
+    + "".join("        " + line + "\n" for line in _VERDICT_FIELDS.splitlines())
+    + """        }
+    ]
+}
+```
+
+"""
+)
+
+_MULTI_CONSIDERATIONS = """- Judge every verified issue on its own; the same junior finding may match several verified issues.
+"""
+
+_TRUTH_FINDINGS = """## **Verified security issues:**
+```json
+{truth_findings}
+```
+"""
+
+CALCULATE_MULTI_PROMPT = (
+    _ROLE
+    + _MULTI_CONTEXT
+    + _MATCH_CRITERIA
+    + _MULTI_CLOSEST_MATCH
+    + _MULTI_OUTPUT_FORMAT
+    + _CONSIDERATIONS_HEADER
+    + _MULTI_CONSIDERATIONS
+    + _CONSIDERATIONS
+    + _JUNIOR_FINDINGS
+    + "\n"
+    + _TRUTH_FINDINGS
+)
+
+PROMPT_LAYOUTS = {
+    "default": CALCULATE_PROMPT,
+    "prefix_cache": CALCULATE_PROMPT_PREFIX_CACHED,
+}
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .types import Vulnerability, WorkingResult
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words, plus the camelCase / snake_case parts of identifiers."""
+    tokens: List[str] = []
+    for word in _WORD.findall(text):
+        lower = word.lower()
+        tokens.append(lower)
+        parts = [p.lower() for p in _CAMEL.findall(word)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return [t for t in tokens if len(t) > 1]
+
+
+def finding_text(finding: Union[Vulnerability, WorkingResult]) -> str:
+    return " ".join([finding.Issue, finding.Description, " ".join(finding.Contracts)])
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents, stored as per-term posting arrays."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(documents)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        lengths = np.zeros(self.n_docs, dtype=np.float64)
+        for doc_id, doc in enumerate(documents):
+            counts = Counter(tokenize(doc))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf)
+
+        avg_len = lengths.mean() if self.n_docs and lengths.mean() > 0 else 1.0
+        # Per-document part of the BM25 denominator, shared by every term
+        self._norm = k1 * (1 - b + b * lengths / avg_len)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        for term, (doc_ids, tfs) in postings.items():
+            df = len(doc_ids)
+            idf = float(np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5)))
+            self._postings[term] = (
+                np.asarray(doc_ids, dtype=np.int64),
+                np.asarray(tfs, dtype=np.float64),
+                idf,
+            )
+
+    @classmethod
+    def from_findings(cls, findings: Sequence[WorkingResult]) -> "BM25Index":
+        return cls([finding_text(f) for f in findings])
+
+    def scores(self, query: str) -> np.ndarray:
+        out = np.zeros(self.n_docs, dtype=np.float64)
+        for term, qtf in Counter(tokenize(query)).items():
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            doc_ids, tfs, idf = posting
+            out[doc_ids] += qtf * idf * tfs * (self.k1 + 1) / (tfs + self._norm[doc_ids])
+        return out
+
+    def rank(self, query: str, within: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Document ids by descending score; ties keep the original order.
+
+        With `within`, only those document ids are ranked.
+        """
+        scores = self.scores(query)
+        if within is None:
+            return np.argsort(-scores, kind="stable")
+        ids = np.asarray(within, dtype=np.int64)
+        return ids[np.argsort(-scores[ids], kind="stable")]
+
+
+@dataclass
+class RankingStats:
+    top_k: int
+    # With top_k_only nothing below the top k is judged, so a match there cannot be
+    # seen and outside_top_k says nothing about the recall lost
+    top_k_only: bool = False
+    matches: int = 0
+    outside_top_k: int = 0
+
+    def record(self, rank: int) -> None:
+        self.matches += 1
+        if rank >= self.top_k:
+            self.outside_top_k += 1
+
+    def summary(self) -> str:
+        outside = "n/a" if self.top_k_only else str(self.outside_top_k)
+        return f"matches={self.matches} outside_top_{self.top_k}={outside}"
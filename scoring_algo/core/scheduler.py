@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from ..settings import get_settings
+from .metrics import get_metrics
+
+T = TypeVar("T")
+
+
+@dataclass
+class SchedulerStats:
+    throttled: int = 0
+    retried: int = 0
+    dropped: int = 0
+    # Calls that failed with an error the scheduler does not retry (4xx, auth, parse errors)
+    failed: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"throttled={self.throttled} retried={self.retried} "
+            f"dropped={self.dropped} failed={self.failed}"
+        )
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute and holds at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float) -> None:
+        # Requests larger than the bucket would never fit; let them through when it is full
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RequestScheduler:
+    """Single entry point for LLM requests.
+
+    Requests first take from the request-per-minute and token-per-minute buckets,
+    then wait for an in-flight slot. The in-flight limit is tuned AIMD-style: it
+    grows by roughly one slot per window of successful calls and halves when the
+    provider throttles or fails. Retryable errors (429, 5xx, connection errors) are
+    retried with exponential backoff and full jitter, honouring `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight: int = 32,
+        min_in_flight: int = 1,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self._rpm = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tpm = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_in_flight = max(1, min(min_in_flight, self.max_in_flight))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limit = float(self.max_in_flight)
+        self._in_flight = 0
+        self._waiting = 0
+        self._cond = asyncio.Condition()
+        self._last_decrease = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_in_flight, int(self._limit))
+
+    async def run(
+        self, call: Callable[[], Awaitable[T]], tokens: int, stats: Optional[SchedulerStats] = None
+    ) -> T:
+        """Run `call` under the rate limits, retrying retryable failures.
+
+        The last error is re-raised once the retries are exhausted.
+        """
+        stats = stats if stats is not None else SchedulerStats()
+        attempt = 0
+        while True:
+            if self._rpm is not None:
+                await self._rpm.acquire(1)
+            if self._tpm is not None:
+                await self._tpm.acquire(tokens)
+            try:
+                async with self._slot():
+                    result = await call()
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                throttled = _is_rate_limit(e)
+                if throttled:
+                    stats.throttled += 1
+                self._on_congestion()
+                if attempt >= self.max_retries:
+                    stats.dropped += 1
+                    raise
+                stats.retried += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self._on_success()
+            return result
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        metrics = get_metrics()
+        async with self._cond:
+            self._waiting += 1
+            metrics.gauge("llm_queue_depth").set(self._waiting)
+            try:
+                while self._in_flight >= self.concurrency_limit:
+                    await self._cond.wait()
+            finally:
+                self._waiting -= 1
+                metrics.gauge("llm_queue_depth").set(self._waiting)
+            self._in_flight += 1
+            metrics.gauge("llm_in_flight").set(self._in_flight)
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._in_flight -= 1
+                metrics.gauge("llm_in_flight").set(self._in_flight)
+                self._cond.notify_all()
+
+    def _on_success(self) -> None:
+        # Additive increase: about +1 slot once `limit` calls have succeeded
+        self._limit = min(float(self.max_in_flight), self._limit + 1.0 / max(1.0, self._limit))
+
+    def _on_congestion(self) -> None:
+        # Multiplicative decrease, at most once per second so a burst of failures
+        # from the same window does not collapse the limit to the floor
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_in_flight), self._limit / 2)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+def _is_rate_limit(e: Exception) -> bool:
+    from openai import RateLimitError
+
+    return isinstance(e, RateLimitError)
+
+
+def _is_retryable(e: Exception) -> bool:
+    # openai is imported here, not at module load, to keep CLI startup cheap
+    from openai import APIConnectionError, APIStatusError, RateLimitError
+
+    if isinstance(e, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(e, APIStatusError) and e.status_code >= 500
+
+
+def _retry_after_seconds(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# One scheduler per event loop, shared by every LLMClient in the process
+_shared_scheduler: Optional[RequestScheduler] = None
+_shared_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_scheduler() -> RequestScheduler:
+    global _shared_scheduler, _shared_scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _shared_scheduler is None or _shared_scheduler_loop is not loop:
+        cfg = get_settings()
+        _shared_scheduler = RequestScheduler(
+            requests_per_minute=cfg.LLM_RPM_LIMIT,
+            tokens_per_minute=cfg.LLM_TPM_LIMIT,
+            max_in_flight=cfg.LLM_MAX_IN_FLIGHT,
+            max_retries=cfg.LLM_MAX_RETRIES,
+            backoff_base=cfg.LLM_BACKOFF_BASE,
+            backoff_max=cfg.LLM_BACKOFF_MAX,
+        )
+        _shared_scheduler_loop = loop
+    return _shared_scheduler
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
+from .jsonstream import iter_json_items
 from .types import CategoryEnum, EvaluatedFinding, Vulnerability
 
 
@@ -19,10 +21,26 @@ def get_evaluation_path(repository: str, output_root: Path) -> Path:
     return output_root / f"{repository}_results.json"
 
 
+def get_partial_path(repository: str, output_root: Path) -> Path:
+    return output_root / f"{repository}_results.partial.json"
+
+
+def get_journal_path(repository: str, output_root: Path) -> Path:
+    return output_root / f"{repository}_results.journal.jsonl"
+
+
+def get_state_path(repository: str, output_root: Path) -> Path:
+    return output_root / f"{repository}_results.state.json"
+
+
 def get_truth_path(repository: str, data_root: Path) -> Path:
     return data_root / "source_of_truth" / f"{repository}.json"
 
 
+def get_repo_path(repository: str, data_root: Path) -> Path:
+    return data_root / "repos" / f"{repository}.json"
+
+
 def normalize_severity(value: Any) -> str:
     if not isinstance(value, str):
         return "N/A"
@@ -107,64 +125,70 @@ def _to_vulnerability(item: Dict[str, Any]) -> Vulnerability:
     return Vulnerability(**params)
 
 
-def read_truth_data(repository: str, data_root: Path) -> List[Vulnerability]:
+def iter_truth_data(repository: str, data_root: Path) -> Iterator[Vulnerability]:
+    """Yield the repo's truth findings one at a time, without loading the whole file."""
     path = get_truth_path(repository, data_root)
-    data = json.loads(path.read_text(encoding="utf-8"))
     # Support two shapes:
     # 1) Array of items already matching our schema
     # 2) Object with { project_id, vulnerabilities: [...] } (current source_of_truth)
-    items: List[Dict[str, Any]]
-    if isinstance(data, list):
-        items = data
-    elif isinstance(data, dict) and isinstance(data.get("vulnerabilities"), list):
-        # Map to our structure
-        items = []
-        for v in data["vulnerabilities"]:
-            mapped = {
+    for key, item in iter_json_items(path, ("vulnerabilities",)):
+        if not isinstance(item, dict):
+            raise ValueError(f"Unsupported truth data format in {path}")
+        if key is not None:
+            # Map to our structure
+            v = item
+            item = {
                 "Issue": v.get("title"),
                 "Category": v.get("category"),
                 "Severity": v.get("severity"),
                 "Description": v.get("description"),
                 "Contracts": [v.get("file")],
             }
-            items.append(mapped)
-    else:
-        raise ValueError(f"Unsupported truth data format in {path}")
 
-    # Clean and normalize
-    for item in items:
+        # Clean and normalize
         item.pop("Submitted", None)
         item.pop("Link", None)
+        yield _to_vulnerability(item)
 
-    return [_to_vulnerability(item) for item in items]
 
+def read_truth_data(repository: str, data_root: Path) -> List[Vulnerability]:
+    return list(iter_truth_data(repository, data_root))
 
-def read_scan_results(repository: str, data_root: Path, scan_source: str) -> List[Vulnerability]:
+
+def iter_scan_results(
+    repository: str, data_root: Path, scan_source: str
+) -> Iterator[Vulnerability]:
+    """Yield the repo's scan findings one at a time, without loading the whole file."""
     path = get_scan_path(repository, data_root, scan_source)
-    data = json.loads(path.read_text(encoding="utf-8"))
-    items: List[Dict[str, Any]]
-    if isinstance(data, list):
-        # e.g., auditagent exporting a plain array of finding objects
-        items = data
-    elif isinstance(data, dict):
-        # e.g., baseline shape { project, findings: [...] }
-        if isinstance(data.get("findings"), list):
-            items = []
-            for f in data["findings"]:
-                mapped = {
-                    "Issue": f.get("title") or f.get("Issue"),
-                    "Severity": f.get("severity") or f.get("Severity"),
-                    "Description": f.get("description") or f.get("Description"),
-                    "file": f.get("file"),
-                    "Category": _map_category_from_vulnerability_type(f.get("vulnerability_type")),
-                }
-                items.append(mapped)
-        else:
+    # Either a plain array of finding objects (e.g. auditagent) or the baseline
+    # shape { project, findings: [...] }
+    for key, f in iter_json_items(path, ("findings",)):
+        if not isinstance(f, dict):
             raise ValueError(f"Unsupported scan results format in {path}")
-    else:
-        raise ValueError(f"Unsupported scan results format in {path}")
+        if key is not None:
+            f = {
+                "Issue": f.get("title") or f.get("Issue"),
+                "Severity": f.get("severity") or f.get("Severity"),
+                "Description": f.get("description") or f.get("Description"),
+                "file": f.get("file"),
+                "Category": _map_category_from_vulnerability_type(f.get("vulnerability_type")),
+            }
+        yield _to_vulnerability(f)
+
+
+def read_scan_results(repository: str, data_root: Path, scan_source: str) -> List[Vulnerability]:
+    return list(iter_scan_results(repository, data_root, scan_source))
 
-    return [_to_vulnerability(it) for it in items]
+
+def read_contract_files(repository: str, data_root: Path) -> List[str]:
+    """The repo's in-scope `contractFiles`, or an empty list if it has no metadata."""
+    path = get_repo_path(repository, data_root)
+    if not path.exists():
+        return []
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        return []
+    return _ensure_list(data.get("contractFiles"))
 
 
 def store_evaluation_result(
@@ -173,7 +197,41 @@ def store_evaluation_result(
     path = get_evaluation_path(repository, output_root)
     ensure_dir(path.parent)
     payload = [r.model_dump(mode="json") for r in results]
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    write_text_atomic(path, json.dumps(payload, indent=2))
+
+
+def store_partial_result(
+    results: List[EvaluatedFinding],
+    repository: str,
+    output_root: Path,
+    stopped: str,
+    unevaluated: List[Vulnerability],
+) -> Path:
+    """Verdicts of a run stopped by its budget, without false positives.
+
+    Which scan findings are false positives depends on every truth finding, so they
+    are only added to the final results file.
+    """
+    path = get_partial_path(repository, output_root)
+    ensure_dir(path.parent)
+    payload = {
+        "repo": repository,
+        "stopped": stopped,
+        "unevaluated": [t.Issue for t in unevaluated],
+        "results": [r.model_dump(mode="json") for r in results],
+    }
+    write_text_atomic(path, json.dumps(payload, indent=2))
+    return path
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write via a temporary file and rename, so readers never see a partial file."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        fh.write(text)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
 
 
 def store_debug_prompt(prompt: str, repository: str, output_root: Path) -> None:
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import atexit
+import functools
+import inspect
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 TELEMETRY_ENABLED: bool = True
 
-try:
-    from langfuse import get_client as _get_client
-    from langfuse import observe as _observe
-except Exception:
-    _get_client = None
-    _observe = None
+
+@functools.lru_cache(maxsize=None)
+def _langfuse() -> Optional[ModuleType]:
+    """The langfuse module, imported on first use; None when it is not installed."""
+    try:
+        import langfuse
+    except Exception:
+        return None
+    return langfuse
 
 
 def set_telemetry(enabled: bool) -> None:
@@ -18,20 +30,176 @@ def set_telemetry(enabled: bool) -> None:
 
 
 def observe(*args: Any, **kwargs: Any):  # decorator factory
-    if TELEMETRY_ENABLED and _observe is not None:
-        return _observe(*args, **kwargs)
+    """Langfuse's `observe`, applied on the first call rather than at import time.
+
+    Decorating a function therefore does not import langfuse, and telemetry can
+    still be switched off after the decorated module was imported.
+    """
+
+    def decorator(func: Callable):
+        traced: List[Callable] = []
+
+        def target() -> Callable:
+            if not TELEMETRY_ENABLED:
+                return func
+            if not traced:
+                langfuse = _langfuse()
+                traced.append(func if langfuse is None else langfuse.observe(*args, **kwargs)(func))
+            return traced[0]
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*a: Any, **kw: Any) -> Any:
+                return await target()(*a, **kw)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*a: Any, **kw: Any) -> Any:
+            return target()(*a, **kw)
+
+        return wrapper
+
+    return decorator
+
+
+class Generation:
+    """Handle of an open generation; `set_payload` defers building its content."""
+
+    def __init__(self, span: Any = None):
+        self.span = span
+        self.build: Optional[Callable[[], Dict[str, Any]]] = None
+
+    def set_payload(self, build: Callable[[], Dict[str, Any]]) -> None:
+        """`build` runs on the exporter thread and returns the generation's update fields."""
+        self.build = build
+
+
+@dataclass
+class ExporterStats:
+    exported: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        return f"exported={self.exported} dropped={self.dropped} failed={self.failed}"
+
+
+_Item = Tuple[Any, int, Optional[Callable[[], Dict[str, Any]]], Optional[str]]
+
+
+class GenerationExporter:
+    """Builds, updates and ends generations on a background thread.
+
+    The event loop only opens the span and records when the call ended; rendering
+    the input and output, any local token counting, and the Langfuse attribute
+    serialization happen here. When the queue is full the generation is ended
+    without its content rather than blocking the caller.
+    """
+
+    def __init__(self, max_queue: int = 10_000):
+        self.stats = ExporterStats()
+        self._queue: "queue.Queue[_Item]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        span: Any,
+        end_ns: int,
+        build: Optional[Callable[[], Dict[str, Any]]],
+        error: Optional[str] = None,
+    ) -> None:
+        self._start()
+        try:
+            self._queue.put_nowait((span, end_ns, build, error))
+        except queue.Full:
+            self.stats.dropped += 1
+            self._export(span, end_ns, None, error)
+
+    def flush(self) -> None:
+        """Wait until every submitted generation has been handed to Langfuse."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="telemetry-export", daemon=True)
+                thread.start()
+                # Registered after the Langfuse client's own hook, so it runs before it
+                atexit.register(self.flush)
+                self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                self._export(*item)
+            finally:
+                self._queue.task_done()
+
+    def _export(
+        self,
+        span: Any,
+        end_ns: int,
+        build: Optional[Callable[[], Dict[str, Any]]],
+        error: Optional[str],
+    ) -> None:
+        try:  # best-effort
+            payload = build() if build is not None else {}
+            if error is not None:
+                payload.update(level="ERROR", status_message=error)
+            if payload:
+                span.update(**payload)
+            if build is not None:
+                self.stats.exported += 1
+        except Exception:
+            self.stats.failed += 1
+        finally:
+            try:
+                span.end(end_time=end_ns)
+            except Exception:
+                pass
+
+
+_exporter = GenerationExporter()
+
 
-    def noop_decorator(func: Callable):
-        return func
+def get_generation_exporter() -> GenerationExporter:
+    return _exporter
 
-    return noop_decorator
 
+@contextmanager
+def generation(name: str, **attributes: Any) -> Iterator[Generation]:
+    """Open a Langfuse generation as the current span for the duration of the block.
 
-def update_generation(**payload: Any) -> None:
-    if not TELEMETRY_ENABLED or _get_client is None:
+    Spans opened inside the block (e.g. by the OpenAI integration) nest under it. On
+    exit only the end time is taken; the content set with `Generation.set_payload` is
+    built and exported by the background `GenerationExporter`.
+    """
+    langfuse = _langfuse() if TELEMETRY_ENABLED else None
+    if langfuse is None:
+        yield Generation()
         return
-    try:  # best-effort
-        client = _get_client()
-        client.update_current_generation(**payload)
+    try:
+        manager = langfuse.get_client().start_as_current_generation(
+            name=name, end_on_exit=False, **attributes
+        )
+        span = manager.__enter__()
     except Exception:
+        yield Generation()
         return
+    handle = Generation(span)
+    error: Optional[str] = None
+    try:
+        yield handle
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        manager.__exit__(None, None, None)
+        _exporter.submit(span, time.time_ns(), handle.build, error)
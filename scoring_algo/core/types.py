@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import json
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -28,6 +30,11 @@ class Severity(Enum):
     BEST_PRACTICES = "Best Practices"
 
 
+class RunMode(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
 class Vulnerability(BaseModel):
     Issue: str = Field(..., description="A short description of the vulnerability or issue")
     Category: CategoryEnum = Field(
@@ -41,8 +48,63 @@ class Vulnerability(BaseModel):
     )
 
 
-class WorkingResult(Vulnerability):
+@dataclass(slots=True)
+class WorkingResult:
+    """A scan finding in the working set, with its index in the scan results.
+
+    A slotted record rather than a pydantic model: the working set is built once per
+    repo and read for every truth finding, and each record keeps its prompt JSON so
+    it is only serialized once.
+    """
+
+    Issue: str
+    Category: CategoryEnum
+    Severity: Severity
+    Description: str
+    Contracts: List[str]
     Index: int
+    _prompt_body: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _nested_body: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_vulnerability(cls, v: Vulnerability, index: int) -> "WorkingResult":
+        return cls(
+            Issue=v.Issue,
+            Category=v.Category,
+            Severity=v.Severity,
+            Description=v.Description,
+            Contracts=list(v.Contracts),
+            Index=index,
+        )
+
+    def prompt_item(self, index: int) -> dict:
+        """The finding as shown to the LLM, at position `index` of its batch."""
+        return {
+            "Issue": self.Issue,
+            "Category": getattr(self.Category, "value", self.Category),
+            "Description": self.Description,
+            "Contracts": self.Contracts,
+            "Severity": getattr(self.Severity, "value", self.Severity),
+            "Index": index,
+        }
+
+    def _body(self) -> str:
+        if self._prompt_body is None:
+            # "Index" is the last key, so everything before its value never changes
+            text = json.dumps(self.prompt_item(0), indent=2)
+            self._prompt_body = text[: -len("0\n}")]
+        return self._prompt_body
+
+    def prompt_json(self, index: int) -> str:
+        """`json.dumps(self.prompt_item(index), indent=2)`, serialized once per record."""
+        return f"{self._body()}{index}\n}}"
+
+    def nested_prompt_json(self, index: int) -> str:
+        """`prompt_json` as it appears inside an `indent=2` list: one level deeper."""
+        if self._nested_body is None:
+            # json.dumps escapes newlines inside strings, so every "\n" is structural
+            self._nested_body = "  " + self._body().replace("\n", "\n  ")
+        return f"{self._nested_body}{index}\n  }}"
 
 
 class Finding(BaseModel):
@@ -58,6 +120,14 @@ class Finding(BaseModel):
     )
 
 
+class TruthVerdict(Finding):
+    truth_id: int = Field(..., description="truth_id of the verified issue this verdict is about")
+
+
+class MultiFinding(BaseModel):
+    verdicts: List[TruthVerdict] = Field(..., description="One verdict per verified issue")
+
+
 class EvaluatedFinding(Finding):
     is_fp: bool | None
     finding_description_from_junior_auditor: str
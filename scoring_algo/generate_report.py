@@ -6,16 +6,35 @@
 # Notes:
 # - If --scan-root is provided and <scan-root>/<repo>_results.json exists, we will use its length for scanFindings.
 # - If not provided (or file missing), scanFindings is derived as matched + partial + fp + qaFindings so that adjustedScanFindings = matched + partial + fp (same effect as the UI).
+# - Per-repo stats are cached in <benchmarks>/.report_cache.json, keyed by the size, mtime and SHA-256 of the
+#   results file and its scan file; only repos whose files changed are recomputed, in parallel worker processes.
+# - --json and --csv also write the per-repo and overall stats for dashboards.
+# - 95% bootstrap intervals for every overview metric are added unless --bootstrap 0: each repo's truth findings
+#   (matched / partial / missed) and scan findings (matched / partial / QA / other) are resampled --bootstrap times
+#   with a fixed --seed. The ALL row is a two-level bootstrap: each replicate also resamples the repos with
+#   replacement and sums a within-repo resample of each repo drawn.
 
 import argparse
+import csv
+import hashlib
+import io
 import json
+import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from scoring_algo.core.bootstrap import METRICS, Interval, bootstrap_intervals, interval_columns
+from scoring_algo.core.storage import write_text_atomic
 from scoring_algo.core.types import RepoStats
 
+REPORT_CACHE_NAME = ".report_cache.json"
+REPORT_CACHE_VERSION = 1
+SEVERITY_COLUMNS = ("high", "medium", "low", "info", "bestpractices")
+
 
 def _norm_sev(value: str) -> str:
     if not isinstance(value, str):
@@ -105,6 +124,10 @@ def _format_pct(x: float) -> str:
     return f"{x * 100:.1f}%"
 
 
+def _format_interval(interval: Interval) -> str:
+    return f"{interval[0] * 100:.1f}–{interval[1] * 100:.1f}%"
+
+
 def _summarize_truth_from_eval(evaluated: List[dict]) -> Tuple[int, int, Dict[str, int]]:
     # actual_findings = total count of truth issues (ALL severities), excluding only FP rows
     # qa_findings_truth = count of truth issues that are QA severities (for info table only)
@@ -283,7 +306,12 @@ def aggregate_overall(stats: List[RepoStats]) -> RepoStats:
     return agg
 
 
-def render_markdown(stats: List[RepoStats], overall: RepoStats) -> str:
+def render_markdown(
+    stats: List[RepoStats],
+    overall: RepoStats,
+    intervals: Optional[Dict[str, Dict[str, Interval]]] = None,
+    n_resamples: int = 0,
+) -> str:
     dt = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
     lines: List[str] = []
     lines.append("# Benchmark Report")
@@ -308,6 +336,28 @@ def render_markdown(stats: List[RepoStats], overall: RepoStats) -> str:
         )
     lines.append("")
 
+    if intervals:
+        lines.append("## Confidence intervals")
+        lines.append("")
+        lines.append(
+            f"_95% percentile bootstrap over {n_resamples} resamples of each repo's truth and scan "
+            "findings; the ALL row also resamples the repos._"
+        )
+        lines.append("")
+        lines.append(
+            "| Repo | Precision | Recall | F1 | P(w/partial) | R(w/partial) | F1(w/partial) |"
+        )
+        lines.append(
+            "|------|-----------|--------|----|--------------|--------------|---------------|"
+        )
+        for s in stats + [overall]:
+            lines.append(
+                f"| {s.repo} | "
+                + " | ".join(_format_interval(intervals[s.repo][m]) for m in METRICS)
+                + " |"
+            )
+        lines.append("")
+
     # Per-repo sections
     for s in stats:
         lines.append(f"## {s.repo}")
@@ -333,10 +383,7 @@ def render_markdown(stats: List[RepoStats], overall: RepoStats) -> str:
             lines.append("|------|--------|-----|------|----------------|")
             lines.append(
                 "| "
-                + " | ".join(
-                    str(s.truth_severity_counts.get(k, 0))
-                    for k in ("high", "medium", "low", "info", "bestpractices")
-                )
+                + " | ".join(str(s.truth_severity_counts.get(k, 0)) for k in SEVERITY_COLUMNS)
                 + " |"
             )
             lines.append("")
@@ -347,17 +394,202 @@ def render_markdown(stats: List[RepoStats], overall: RepoStats) -> str:
             lines.append("|------|--------|-----|------|----------------|")
             lines.append(
                 "| "
-                + " | ".join(
-                    str(s.scan_severity_counts.get(k, 0))
-                    for k in ("high", "medium", "low", "info", "bestpractices")
-                )
+                + " | ".join(str(s.scan_severity_counts.get(k, 0)) for k in SEVERITY_COLUMNS)
                 + " |"
             )
             lines.append("")
     return "\n".join(lines)
 
 
-def generate_markdown_report(benchmarks: Path, out: Path, scan_root: Optional[Path] = None) -> None:
+def _file_signature(path: Optional[Path], with_hash: bool = True) -> Optional[Dict[str, Any]]:
+    if path is None or not path.is_file():
+        return None
+    st = path.stat()
+    signature: Dict[str, Any] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_hash:
+        signature["sha256"] = _sha256(path)
+    return signature
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_fresh(path: Optional[Path], cached: Optional[Dict[str, Any]]) -> bool:
+    """Whether `path` still has the content recorded in `cached`.
+
+    Size and mtime decide the common case without reading the file; only a file with
+    the same size but a new mtime (touched, re-copied) is hashed. A fresh file with a
+    new mtime gets its cached signature updated in place.
+    """
+    current = _file_signature(path, with_hash=False)
+    if path is None or current is None or cached is None:
+        return current is None and cached is None
+    if current["size"] != cached["size"]:
+        return False
+    if current["mtime_ns"] == cached["mtime_ns"]:
+        return True
+    if _sha256(path) != cached["sha256"]:
+        return False
+    cached["mtime_ns"] = current["mtime_ns"]
+    return True
+
+
+def _scan_path_for(eval_path: Path, scan_root: Optional[Path]) -> Optional[Path]:
+    if not scan_root:
+        return None
+    return scan_root / f"{_parse_repo_name(eval_path)}_results.json"
+
+
+def _compute_cache_entry(eval_path: Path, scan_root: Optional[Path]) -> Dict[str, Any]:
+    # Signatures are taken before reading, so a file rewritten meanwhile is recomputed next time
+    results_sig = _file_signature(eval_path)
+    scan_sig = _file_signature(_scan_path_for(eval_path, scan_root))
+    stats = compute_repo_stats(eval_path, scan_root)
+    return {
+        "scan_root": str(scan_root) if scan_root else None,
+        "results": results_sig,
+        "scan": scan_sig,
+        "stats": stats.model_dump(mode="json"),
+    }
+
+
+def _load_report_cache(path: Path) -> Dict[str, Any]:
+    data = _load_json(path)
+    if not isinstance(data, dict) or data.get("version") != REPORT_CACHE_VERSION:
+        return {}
+    repos = data.get("repos")
+    return repos if isinstance(repos, dict) else {}
+
+
+def collect_repo_stats(
+    results_files: List[Path],
+    scan_root: Optional[Path],
+    cache_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> List[RepoStats]:
+    """Stats for every results file, reusing cached entries whose files did not change.
+
+    Stale repos are recomputed in a process pool (inline when only one is stale),
+    and the cache is rewritten when anything changed.
+    """
+    cache = _load_report_cache(cache_path) if cache_path else {}
+    scan_root_key = str(scan_root) if scan_root else None
+    cached_before = {name: json.dumps(entry, sort_keys=True) for name, entry in cache.items()}
+
+    stale: List[Path] = []
+    for p in results_files:
+        entry = cache.get(p.name)
+        if (
+            entry is None
+            or entry.get("scan_root") != scan_root_key
+            or not _is_fresh(p, entry.get("results"))
+            or not _is_fresh(_scan_path_for(p, scan_root), entry.get("scan"))
+        ):
+            stale.append(p)
+
+    if len(stale) > 1 and workers != 1:
+        max_workers = workers or min(len(stale), os.cpu_count() or 1)
+        chunksize = max(1, len(stale) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            entries = list(
+                pool.map(_compute_cache_entry, stale, repeat(scan_root), chunksize=chunksize)
+            )
+    else:
+        entries = [_compute_cache_entry(p, scan_root) for p in stale]
+    for p, entry in zip(stale, entries):
+        cache[p.name] = entry
+
+    names = {p.name for p in results_files}
+    current = {name: entry for name, entry in cache.items() if name in names}
+    print(f"Repo stats: {len(results_files) - len(stale)} cached, {len(stale)} recomputed")
+    changed = {n: json.dumps(e, sort_keys=True) for n, e in current.items()} != cached_before
+    if cache_path and changed:
+        write_text_atomic(
+            cache_path, json.dumps({"version": REPORT_CACHE_VERSION, "repos": current})
+        )
+    return [RepoStats(**current[p.name]["stats"]) for p in results_files]
+
+
+def render_json(
+    stats: List[RepoStats],
+    overall: RepoStats,
+    intervals: Optional[Dict[str, Dict[str, Interval]]] = None,
+    n_resamples: int = 0,
+) -> str:
+    payload: Dict[str, Any] = {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repos": [s.model_dump(mode="json") for s in stats],
+        "overall": overall.model_dump(mode="json"),
+    }
+    if intervals:
+        payload["confidence_intervals"] = {
+            "level": 0.95,
+            "resamples": n_resamples,
+            "repos": {
+                repo: {m: list(bounds) for m, bounds in metrics.items()}
+                for repo, metrics in intervals.items()
+            },
+        }
+    return json.dumps(payload, indent=2)
+
+
+def render_csv(
+    stats: List[RepoStats],
+    overall: RepoStats,
+    intervals: Optional[Dict[str, Dict[str, Interval]]] = None,
+    n_resamples: int = 0,
+) -> str:
+    metrics = [
+        "actual_findings",
+        "scan_findings",
+        "matched",
+        "partial",
+        "qa_findings",
+        "false_positives",
+        "false_negatives",
+        "precision",
+        "recall",
+        "f1",
+        "precision_with_partial",
+        "recall_with_partial",
+        "f1_with_partial",
+    ]
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(
+        ["repo"]
+        + metrics
+        + [f"truth_{k}" for k in SEVERITY_COLUMNS]
+        + [f"scan_{k}" for k in SEVERITY_COLUMNS]
+        + ([f"{m}_{b}" for m in METRICS for b in ("low", "high")] if intervals else [])
+    )
+    for s in stats + [overall]:
+        writer.writerow(
+            [s.repo]
+            + [getattr(s, m) for m in metrics]
+            + [s.truth_severity_counts.get(k, 0) for k in SEVERITY_COLUMNS]
+            + [s.scan_severity_counts.get(k, 0) for k in SEVERITY_COLUMNS]
+            + (interval_columns(intervals[s.repo]) if intervals else [])
+        )
+    return buf.getvalue()
+
+
+def generate_markdown_report(
+    benchmarks: Path,
+    out: Path,
+    scan_root: Optional[Path] = None,
+    json_out: Optional[Path] = None,
+    csv_out: Optional[Path] = None,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    bootstrap: int = 1000,
+    seed: int = 0,
+) -> None:
     bench_dir: Path = benchmarks
     if not bench_dir.exists() or not bench_dir.is_dir():
         raise FileNotFoundError(f"Benchmarks directory not found: {bench_dir}")
@@ -368,15 +600,26 @@ def generate_markdown_report(benchmarks: Path, out: Path, scan_root: Optional[Pa
     if not results_files:
         raise FileNotFoundError(f"No *_results.json files found in {bench_dir}")
 
-    stats: List[RepoStats] = []
-    for p in results_files:
-        stats.append(compute_repo_stats(p, scan_root))
+    stats = collect_repo_stats(
+        results_files,
+        scan_root,
+        cache_path=bench_dir / REPORT_CACHE_NAME if use_cache else None,
+        workers=workers,
+    )
 
     overall = aggregate_overall(stats)
-    md = render_markdown(stats, overall)
-    final_out = out if out.is_absolute() else (bench_dir / out)
-    final_out.write_text(md, encoding="utf-8")
-    print(f"Wrote report to {final_out}")
+    intervals = (
+        bootstrap_intervals(stats, n_resamples=bootstrap, seed=seed) if bootstrap > 0 else None
+    )
+    outputs = [(out, render_markdown)]
+    if json_out is not None:
+        outputs.append((json_out, render_json))
+    if csv_out is not None:
+        outputs.append((csv_out, render_csv))
+    for path, render in outputs:
+        final_out = path if path.is_absolute() else (bench_dir / path)
+        final_out.write_text(render(stats, overall, intervals, bootstrap), encoding="utf-8")
+        print(f"Wrote report to {final_out}")
 
 
 def main():
@@ -398,9 +641,34 @@ def main():
     parser.add_argument(
         "--out", type=Path, default=Path("REPORT.md"), help="Output Markdown file path"
     )
+    parser.add_argument("--json", type=Path, default=None, help="Optional JSON output file path")
+    parser.add_argument("--csv", type=Path, default=None, help="Optional CSV output file path")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Recompute every repo and skip the stats cache"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes for stale repos (default: CPUs)"
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=1000,
+        help="Bootstrap resamples for the 95%% confidence intervals (0 to disable)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the bootstrap resamples")
     args = parser.parse_args()
 
-    generate_markdown_report(args.benchmarks, args.out, args.scan_root)
+    generate_markdown_report(
+        args.benchmarks,
+        args.out,
+        args.scan_root,
+        json_out=args.json,
+        csv_out=args.csv,
+        use_cache=not args.no_cache,
+        workers=args.workers,
+        bootstrap=args.bootstrap,
+        seed=args.seed,
+    )
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,10 +24,43 @@ class Settings(BaseSettings):
     MODEL: str = "o4-mini"
     ITERATIONS: int = 3
     BATCH_SIZE: int = 10
+    BATCH_MODE: Literal["count", "tokens"] = "count"
+    BATCH_TOKEN_BUDGET: int = 8000
+    BATCH_FANOUT: int = 1
+    PROMPT_LAYOUT: Literal["default", "prefix_cache"] = "default"
+    JUDGE_MODE: Literal["single", "multi"] = "single"
+    MULTI_TRUTH_TOKEN_BUDGET: int = 6000
+    RANK_CANDIDATES: bool = False
+    RANK_TOP_K: int = 20
+    RANK_TOP_K_ONLY: bool = False
+    CONTRACT_PRUNING: bool = False
     SCAN_SOURCE: str = "baseline"
     DATA_ROOT: str = "../data"
     OUTPUT_ROOT: str = "../benchmarks"
     DEBUG_PROMPT: bool = False
+    MAX_CONCURRENCY: int = 4
+    MAX_PARALLEL_REPOS: int = 1
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_TIMEOUT: float = 600.0
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_RPM_LIMIT: int = 0
+    LLM_TPM_LIMIT: int = 0
+    LLM_MAX_IN_FLIGHT: int = 32
+    LLM_MAX_RETRIES: int = 6
+    LLM_BACKOFF_BASE: float = 1.0
+    LLM_BACKOFF_MAX: float = 60.0
+    RUN_MODE: str = "interactive"
+    BATCH_API_DIR: str = "../.cache/batch_jobs"
+    BATCH_API_POLL_INTERVAL: float = 30.0
+    BATCH_API_COMPLETION_WINDOW: str = "24h"
+    CACHE_MODE: str = "off"
+    CACHE_PATH: str = "../.cache/llm_verdicts.sqlite"
+    CACHE_MAX_ENTRIES: int = 100_000
+    # Per-stage metrics; a Prometheus text file rewritten during the run and/or a /metrics port
+    METRICS_FILE: str | None = None
+    METRICS_INTERVAL: float = 15.0
+    METRICS_PORT: int = 0
     SUPPORTED_MODELS: dict[str, list[str]] = {
         "openai": [
             "o3-2025-04-16",
@@ -33,10 +69,41 @@ class Settings(BaseSettings):
             "gpt-5-2025-08-07",
             "gpt-5-nano-2025-08-07",
         ],
+        "local": ["local"],
+    }
+    # USD per million tokens for each model above; reasoning tokens are billed as output
+    MODEL_PRICES: dict[str, dict[str, float]] = {
+        "o3-2025-04-16": {"input": 2.0, "cached_input": 0.5, "output": 8.0},
+        "o4-mini": {"input": 1.1, "cached_input": 0.275, "output": 4.4},
+        "gpt-4.1-nano-2025-04-14": {"input": 0.1, "cached_input": 0.025, "output": 0.4},
+        "gpt-5-2025-08-07": {"input": 1.25, "cached_input": 0.125, "output": 10.0},
+        "gpt-5-nano-2025-08-07": {"input": 0.05, "cached_input": 0.005, "output": 0.4},
+        "local": {"input": 0.0, "cached_input": 0.0, "output": 0.0},
     }
+    # Cheaper models, cheapest first, that screen each prompt before MODEL; CASCADE_VOTES
+    # agreeing non-match votes from one of them settle it. Empty: MODEL judges everything
+    CASCADE_MODELS: list[str] = []
+    CASCADE_VOTES: int = 2
+    # Budget caps (0 = none): no new truth finding is dispatched once one is reached
+    MAX_COST: float = 0.0
+    MAX_TOKENS: int = 0
+    MAX_REPO_COST: float = 0.0
+    MAX_REPO_TOKENS: int = 0
+    # Offline backend used by the "local" provider
+    LOCAL_FIXTURE: str | None = None
+    LOCAL_LATENCY_MS: float = 0.0
+    LOCAL_LATENCY_JITTER_MS: float = 0.0
+    LOCAL_MATCH_THRESHOLD: float = 0.2
+    LOCAL_PARTIAL_THRESHOLD: float = 0.15
     LANGFUSE_HOST: str | None = Field(default=None, env="LANGFUSE_HOST")
     LANGFUSE_PUBLIC_KEY: str | None = Field(default=None, env="LANGFUSE_PUBLIC_KEY")
     LANGFUSE_SECRET_KEY: str | None = Field(default=None, env="LANGFUSE_SECRET_KEY")
     LANGFUSE_USER_ID: str | None = Field(default=None, env="LANGFUSE_USER_ID")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings shared by library code that has no config passed in explicitly."""
+    return Settings()